@@ -3,15 +3,35 @@ Dashboard Credit Scoring Production - Corrigé avec analyse bi-variée unique
 """
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import RerunException, StopException, add_script_run_ctx, get_script_run_ctx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
+import functools
 import json
+import re
+import logging
+import asyncio
+import os
+import hashlib
+import shutil
 import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 
+from population_encoding import (
+   CATEGORICAL_FEATURES, DASHBOARD_FEATURES, FEATURE_BOUNDS, HISTOGRAM_BINS, encode_categorical_values,
+   histogram_bars
+)
+
+# Début du rerun complet du script (durée enregistrée en fin de script)
+SCRIPT_RUN_START = time.perf_counter()
+
 # Configuration Streamlit
 st.set_page_config(
    page_title="Dashboard Credit Scoring - Prêt à dépenser",
@@ -20,6 +40,14 @@ st.set_page_config(
    initial_sidebar_state="expanded"
 )
 
+# Journal applicatif (durées de préchauffage, etc.)
+logger = logging.getLogger("dashboard")
+if not logger.handlers:
+   log_handler = logging.StreamHandler()
+   log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [dashboard] %(message)s"))
+   logger.addHandler(log_handler)
+   logger.setLevel(logging.INFO)
+
 # Configuration Plotly pour accessibilité WCAG
 PLOTLY_CONFIG = {
    'displayModeBar': True,
@@ -36,7 +64,7 @@ PLOTLY_CONFIG = {
 }
 
 # CSS
-st.markdown("""
+DASHBOARD_CSS = """
 <style>
 /* Styles WCAG */
 .main-header {
@@ -172,10 +200,123 @@ st.markdown("""
    }
 }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-# Configuration API (Railway)
-API_URL = "https://dashboard-credit-scoring-production.up.railway.app"
+@st.cache_resource
+def get_dashboard_css():
+   """CSS minifié une seule fois par processus (ré-injecté à chaque rerun)"""
+   css = re.sub(r'/\*.*?\*/', '', DASHBOARD_CSS, flags=re.DOTALL)
+   return re.sub(r'\s+', ' ', css).strip()
+
+st.markdown(get_dashboard_css(), unsafe_allow_html=True)
+
+# Configuration API (Railway, ou API locale pour benchmarks : tools/mock_api.py)
+API_URL = os.environ.get("DASHBOARD_API_URL", "https://dashboard-credit-scoring-production.up.railway.app")
+
+# Configuration transport HTTP (connexions persistantes)
+API_CONNECT_TIMEOUT = 3.05  # secondes pour établir la connexion TCP+TLS
+API_POOL_SIZE = 20          # connexions conservées par hôte
+API_GET_RETRIES = 3         # nouvelles tentatives sur les GET idempotents
+API_RETRY_BACKOFF = 0.3     # délai exponentiel entre tentatives (0.3s, 0.6s, 1.2s)
+API_MAX_CONCURRENCY = 8     # appels simultanés par lot d'appels indépendants
+
+# Chargement groupé de la population
+POPULATION_BATCH_ROUTE = "/population_batch"  # route batch optionnelle côté serveur
+POPULATION_FETCH_WORKERS = 5                  # appels parallèles si pas de route batch
+
+# Store population partagé (tableaux NumPy mappés en mémoire)
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+POPULATION_STORE_DIR = os.environ.get("DASHBOARD_POPULATION_STORE_DIR", os.path.join(APP_DIR, ".population_store"))
+POPULATION_STORE_KEEP_VERSIONS = 3       # versions récentes toujours conservées sur disque
+POPULATION_STORE_GRACE_PERIOD = 24 * 3600  # secondes sans utilisation avant suppression d'une ancienne version
+CATEGORICAL_MISSING = -1  # valeur manquante pour les colonnes int8
+POPULATION_HISTOGRAM_BINS = HISTOGRAM_BINS  # barres pré-calculées par histogramme (population_encoding.py)
+POPULATION_SNAPSHOT_DIR = os.environ.get("DASHBOARD_SNAPSHOT_DIR", os.path.join(APP_DIR, "snapshots"))
+SNAPSHOT_METADATA_KEY = b'population_snapshot'  # métadonnées Parquet (tools/build_population_snapshot.py)
+SNAPSHOT_SORTED_PREFIX = '__sorted__'           # colonnes triées pré-calculées
+BIVARIATE_DENSITY_THRESHOLD = 20000  # au-delà, nuage de points remplacé par une carte de densité
+BIVARIATE_DENSITY_BINS = 60          # cellules par axe de la grille 2D
+
+# Scoring par lot
+BATCH_CHUNK_SIZE = 100   # clients par paquet (mise à jour de la progression)
+BATCH_MAX_WORKERS = 8    # appels /predict_dashboard simultanés au maximum
+
+# Cache des prédictions partagé entre sessions
+PREDICTION_CACHE_SIZE = 1000  # profils conservés (éviction LRU)
+PREDICTION_CACHE_TTL = 3600   # secondes
+
+# Stale-while-revalidate : dernière valeur valide servie pendant le rafraîchissement en arrière-plan
+POPULATION_TTL = 3600  # secondes avant revalidation des données population
+POPULATION_MAX_STALENESS = float(os.environ.get("DASHBOARD_POPULATION_MAX_STALENESS", "86400"))  # au-delà du TTL
+HEALTH_TTL = 300       # secondes avant revalidation du statut API
+HEALTH_MAX_STALENESS = float(os.environ.get("DASHBOARD_HEALTH_MAX_STALENESS", "900"))  # au-delà du TTL
+FAILURE_TTL = 30       # secondes pendant lesquelles un échec de chargement est resservi sans nouvel appel
+
+# Moteur de scoring local (même modèle et même seuil que l'API)
+LOCAL_MODEL_PATH = os.environ.get("DASHBOARD_MODEL_PATH", os.path.join(APP_DIR, "models", "credit_scoring_model.pkl"))
+LOCAL_THRESHOLD_PATH = os.environ.get("DASHBOARD_THRESHOLD_PATH", os.path.join(APP_DIR, "models", "optimal_threshold_optimized.pkl"))
+LOCAL_MODEL_VERSION = os.environ.get("DASHBOARD_MODEL_VERSION")  # version du modèle local (comparée à /health)
+LOCAL_TOP_FEATURES = 5  # variables expliquées, comme la réponse API
+BATCH_TOP_FACTORS = 3   # principaux facteurs affichés par demandeur (scoring par lot)
+EXPLANATION_CACHE_SIZE = 2000  # explications locales conservées (éviction LRU)
+SCORING_MODES = {
+   'api': "🌐 API (repli local si indisponible)",
+   'local': "💻 Moteur local"
+}
+
+# Simulation what-if
+SIMULATION_DEBOUNCE = 0.3   # secondes d'attente avant re-scoring (curseur encore en mouvement)
+SIMULATION_WORKERS = 4      # re-scorings simultanés (toutes sessions)
+SIMULATION_HISTORY_SIZE = 200  # scénarios déjà scorés conservés par session
+
+# Analyse de sensibilité (grilles de valeurs candidates)
+SENSITIVITY_POINTS_1D = 41  # valeurs testées pour une variable
+SENSITIVITY_POINTS_2D = 21  # valeurs testées par axe pour deux variables
+SENSITIVITY_POINTS_1D_API = 21  # grille réduite via l'API (un appel par point)
+SENSITIVITY_POINTS_2D_API = 9   # 81 appels via l'API au lieu de 441
+
+# Recherche contrefactuelle (clients refusés)
+COUNTERFACTUAL_FEATURES = ['PAYMENT_RATE', 'AMT_ANNUITY', 'INSTAL_DPD_MEAN']  # variables actionnables
+COUNTERFACTUAL_STEPS = 20            # intervalles de la grille grossière par variable
+COUNTERFACTUAL_REFINE_POINTS = 8     # points testés par tour d'affinage au pas des curseurs
+COUNTERFACTUAL_CHUNK_LOCAL = 512     # candidats par lot (moteur local)
+COUNTERFACTUAL_CHUNK_API = 32        # candidats par lot (API)
+COUNTERFACTUAL_TIME_BUDGET = 2.0     # secondes par client
+
+# Explications globales pré-calculées (tools/build_global_explanations.py)
+GLOBAL_EXPLANATIONS_DIR = os.environ.get("DASHBOARD_GLOBAL_EXPLANATIONS_DIR", os.path.join(APP_DIR, "global_explanations"))
+GLOBAL_BEESWARM_POINTS = 400  # points par variable dans le résumé beeswarm
+
+# Rendu des onglets d'analyse : seul l'onglet affiché est construit (sinon st.tabs classiques)
+LAZY_TABS = os.environ.get("DASHBOARD_LAZY_TABS", "1") != "0"
+GAUGE_TEMPLATE_CACHE_SIZE = 8  # gabarits de jauge mémorisés (un par seuil de décision)
+
+# Instrumentation des étapes (réseau, modèle, figures, rendu)
+INSTRUMENTATION_BUFFER_SIZE = 1000  # dernières mesures conservées par étape (percentiles)
+ADMIN_PANEL = os.environ.get("DASHBOARD_ADMIN_PANEL", "1") != "0"
+METRICS_EXPORT_PATH = os.environ.get("DASHBOARD_METRICS_FILE")  # export JSON en fin de rerun (benchmarks)
+STAGE_CATEGORIES = {
+   '/': "Réseau",
+   'local:': "Modèle local",
+   'pandas:': "Pandas",
+   'calcul:': "Calcul NumPy",
+   'figure:': "Construction figure",
+   'plotly:': "Sérialisation Plotly",
+   'render:': "Rendu",
+   'rerun:': "Rerun",
+   'coalesced:': "Réseau (appel partagé)",
+   'analyse:': "Analyse"
+}
+
+# Préchauffage au démarrage du processus
+WARMUP_TIMEOUT = float(os.environ.get("DASHBOARD_WARMUP_TIMEOUT", "0"))  # secondes d'attente du préchauffage au premier rendu (0 = arrière-plan)
+
+# Arrondis alignés sur les pas des widgets du formulaire (clé canonique)
+CANONICAL_ROUNDING = {
+   'EXT_SOURCE_2': 2, 'EXT_SOURCE_3': 2, 'EXT_SOURCE_1': 2,
+   'PAYMENT_RATE': 2, 'INSTAL_DPD_MEAN': 1, 'DAYS_EMPLOYED': 0,
+   'AMT_ANNUITY': 0, 'INSTAL_AMT_PAYMENT_SUM': 0
+}
 
 # Traductions des features
 FEATURE_TRANSLATIONS = {
@@ -205,12 +346,6 @@ FEATURE_EXPLANATIONS = {
 }
 
 # Les 10 variables dashboard
-DASHBOARD_FEATURES = [
-   'EXT_SOURCE_2', 'EXT_SOURCE_3', 'EXT_SOURCE_1',
-   'DAYS_EMPLOYED', 'CODE_GENDER', 'INSTAL_DPD_MEAN',
-   'PAYMENT_RATE', 'NAME_EDUCATION_TYPE_Higher_education',
-   'AMT_ANNUITY', 'INSTAL_AMT_PAYMENT_SUM'
-]
 
 # Gestionnaire de cache centralisé
 class CacheManager:
@@ -219,6 +354,8 @@ class CacheManager:
        """Nettoyer tous les caches"""
        # Clear Streamlit cache
        st.cache_data.clear()
+       get_population_cache().invalidate()
+       get_health_cache().invalidate()
        
        # Clear session state cache
        keys_to_remove = [key for key in st.session_state.keys() if 
@@ -241,6 +378,14 @@ def init_session_state():
        'prediction_result': None,
        'api_call_in_progress': False, 
        'last_analysis_time': None,
+       'population_loaded': False,
+       'simulation_results': {},
+       'simulation_pending': None,
+       'sensitivity_result': None,
+       'counterfactual_result': None,
+       'scoring_mode': 'api',
+       'scoring_mode_before_outage': None,
+       'batch_results': None,
        'population_cache': {},
        'bivariate_cache': {}
    }
@@ -252,17 +397,310 @@ def init_session_state():
 # Appeler une seule fois
 init_session_state()
 
+# Transport HTTP partagé par processus
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+   """Session HTTP partagée avec pool de connexions keep-alive"""
+   session = requests.Session()
+
+   # Retries avec backoff uniquement sur les GET (idempotents)
+   retry = Retry(
+       total=API_GET_RETRIES,
+       backoff_factor=API_RETRY_BACKOFF,
+       status_forcelist=[502, 503, 504],
+       allowed_methods=["GET"],
+       raise_on_status=False
+   )
+   adapter = HTTPAdapter(
+       pool_connections=API_POOL_SIZE,
+       pool_maxsize=API_POOL_SIZE,
+       max_retries=retry
+   )
+   session.mount("https://", adapter)
+   session.mount("http://", adapter)
+   session.headers.update({"Connection": "keep-alive"})
+   return session
+
+class LatencyStats:
+   """Mesures par étape dans un tampon circulaire partagé entre sessions (percentiles, tailles)"""
+
+   def __init__(self, buffer_size=INSTRUMENTATION_BUFFER_SIZE):
+       self._lock = threading.Lock()
+       self._stats = {}
+       self.buffer_size = buffer_size
+
+   @staticmethod
+   def endpoint_name(url):
+       """Normaliser l'URL en nom d'endpoint (sans paramètre de chemin)"""
+       path = url.replace(API_URL, '').split('?')[0] or '/'
+       if path.startswith('/population/'):
+           return '/population/{variable}'
+       return path
+
+   @staticmethod
+   def category(stage):
+       """Famille d'une étape d'après son préfixe"""
+       for prefix, category in STAGE_CATEGORIES.items():
+           if stage.startswith(prefix):
+               return category
+       return "Autre"
+
+   def record(self, endpoint, elapsed, ok=True, size=None):
+       """Enregistrer la durée (et la taille de charge utile en octets) d'une étape"""
+       with self._lock:
+           stats = self._stats.setdefault(endpoint, {
+               'calls': 0, 'errors': 0, 'total': 0.0, 'bytes': 0,
+               'samples': deque(maxlen=self.buffer_size)
+           })
+           stats['calls'] += 1
+           stats['errors'] += 0 if ok else 1
+           stats['total'] += elapsed
+           stats['bytes'] += size or 0
+           stats['samples'].append(elapsed)
+
+   def snapshot(self):
+       """Copie cohérente des compteurs et des percentiles (secondes) par étape"""
+       with self._lock:
+           stats_items = [(stage, dict(stats, samples=np.array(stats['samples']))) for stage, stats in self._stats.items()]
+       snapshot = {}
+       for stage, stats in sorted(stats_items):
+           p50, p95, p99 = np.percentile(stats['samples'], [50, 95, 99])
+           snapshot[stage] = {
+               'category': self.category(stage),
+               'calls': stats['calls'],
+               'errors': stats['errors'],
+               'sum': stats['total'],
+               'bytes': stats['bytes'],
+               'p50': float(p50),
+               'p95': float(p95),
+               'p99': float(p99),
+               'max': float(stats['samples'].max())
+           }
+       return snapshot
+
+   def summary(self):
+       """Résumé des latences (ms) par étape"""
+       return [
+           {
+               'Étape': stage,
+               'Famille': stats['category'],
+               'Appels': stats['calls'],
+               'Erreurs': stats['errors'],
+               'p50 (ms)': round(stats['p50'] * 1000, 1),
+               'p95 (ms)': round(stats['p95'] * 1000, 1),
+               'p99 (ms)': round(stats['p99'] * 1000, 1),
+               'Max (ms)': round(stats['max'] * 1000, 1),
+               'Ko / appel': round(stats['bytes'] / stats['calls'] / 1024, 1)
+           }
+           for stage, stats in self.snapshot().items()
+       ]
+
+   def to_json(self):
+       """Export JSON des mesures (secondes, octets)"""
+       return json.dumps({
+           'generated_at': datetime.now().isoformat(timespec='seconds'),
+           'buffer_size': self.buffer_size,
+           'stages': self.snapshot()
+       }, indent=2, ensure_ascii=False)
+
+   def to_prometheus(self):
+       """Export au format texte Prometheus (summary par étape)"""
+       lines = [
+           "# HELP dashboard_stage_duration_seconds Durée des étapes du dashboard",
+           "# TYPE dashboard_stage_duration_seconds summary"
+       ]
+       snapshot = self.snapshot()
+       for stage, stats in snapshot.items():
+           labels = f'stage="{stage}",category="{stats["category"]}"'
+           for quantile, key in (("0.5", 'p50'), ("0.95", 'p95'), ("0.99", 'p99')):
+               lines.append(f'dashboard_stage_duration_seconds{{{labels},quantile="{quantile}"}} {stats[key]:.6f}')
+           lines.append(f"dashboard_stage_duration_seconds_sum{{{labels}}} {stats['sum']:.6f}")
+           lines.append(f"dashboard_stage_duration_seconds_count{{{labels}}} {stats['calls']}")
+       lines += [
+           "# HELP dashboard_stage_errors_total Étapes terminées en erreur",
+           "# TYPE dashboard_stage_errors_total counter"
+       ]
+       lines += [f'dashboard_stage_errors_total{{stage="{stage}"}} {stats["errors"]}' for stage, stats in snapshot.items()]
+       lines += [
+           "# HELP dashboard_stage_payload_bytes_total Octets échangés par étape",
+           "# TYPE dashboard_stage_payload_bytes_total counter"
+       ]
+       lines += [f'dashboard_stage_payload_bytes_total{{stage="{stage}"}} {stats["bytes"]}' for stage, stats in snapshot.items()]
+       return "\n".join(lines) + "\n"
+
+@st.cache_resource(show_spinner=False)
+def get_latency_stats():
+   """Compteurs de latence partagés par processus"""
+   return LatencyStats()
+
+def timed_stage(stage):
+   """Enregistrer la durée de chaque appel sous le nom d'étape donné (ou calculé par `stage()`)"""
+   def decorator(func):
+       @functools.wraps(func)
+       def wrapper(*args, **kwargs):
+           start = time.perf_counter()
+           ok = False
+           interrupted = False
+           try:
+               result = func(*args, **kwargs)
+               ok = True
+               return result
+           except (RerunException, StopException):
+               # st.rerun / st.stop : flux de contrôle Streamlit, ni erreur ni durée complète
+               interrupted = True
+               raise
+           finally:
+               if not interrupted:
+                   name = stage() if callable(stage) else stage
+                   get_latency_stats().record(name, time.perf_counter() - start, ok)
+       return wrapper
+   return decorator
+
+def is_fragment_rerun():
+   """Vrai pendant un rerun limité à un fragment (et non un rerun complet du script)"""
+   ctx = get_script_run_ctx()
+   return bool(ctx is not None and getattr(ctx, 'fragment_ids_this_run', None))
+
+def timed_rerun(name):
+   """Durée d'un panneau fragment : rerun:<nom> s'il est relancé seul, render:<nom> dans un rerun complet"""
+   return timed_stage(lambda: f"rerun:{name}" if is_fragment_rerun() else f"render:{name}")
+
+def show_plotly_chart(fig, **kwargs):
+   """st.plotly_chart chronométré (sérialisation de la figure et envoi au navigateur)"""
+   start = time.perf_counter()
+   try:
+       return st.plotly_chart(fig, **kwargs)
+   finally:
+       get_latency_stats().record('plotly:chart', time.perf_counter() - start)
+
+# Couche d'appels concurrents (asyncio + sémaphore borné)
+
+def bind_script_run_ctx(func):
+   """Propager le contexte Streamlit du thread appelant vers un thread de travail"""
+   ctx = get_script_run_ctx()
+
+   def call_with_context(*args):
+       # Contexte nécessaire aux fonctions en cache et à st.session_state
+       if ctx is not None:
+           add_script_run_ctx(threading.current_thread(), ctx)
+       return func(*args)
+
+   return call_with_context
+
+async def _bounded_call(semaphore, func, args):
+   """Exécuter un appel bloquant dans un thread, sous limite de concurrence"""
+   async with semaphore:
+       return await asyncio.to_thread(func, *args)
+
+def run_concurrently(calls, max_concurrency=API_MAX_CONCURRENCY):
+   """Exécuter des appels indépendants [(func, args), ...] en parallèle, résultats dans l'ordre"""
+   async def gather_calls():
+       semaphore = asyncio.Semaphore(max_concurrency)
+       return await asyncio.gather(*(
+           _bounded_call(semaphore, bind_script_run_ctx(func), args) for func, args in calls
+       ))
+
+   return asyncio.run(gather_calls())
+
+# Regroupement des appels identiques simultanés (single-flight)
+
+class SingleFlight:
+   """Appels identiques en vol partagés entre sessions : un seul appel amont, résultat diffusé"""
+
+   def __init__(self):
+       self._lock = threading.Lock()
+       self._in_flight = {}
+       self.leaders = 0
+       self.followers = 0
+       self.timeouts = 0
+
+   def do(self, key, func, wait_timeout, stage):
+       """Exécuter func une seule fois par clé en vol ; les suivants attendent au plus wait_timeout"""
+       with self._lock:
+           call = self._in_flight.get(key)
+           is_leader = call is None
+           if is_leader:
+               call = {'done': threading.Event(), 'result': None}
+               self._in_flight[key] = call
+               self.leaders += 1
+           else:
+               self.followers += 1
+
+       if is_leader:
+           try:
+               call['result'] = func()
+           except Exception as e:
+               call['result'] = (None, f"Erreur réseau: {str(e)}")
+           finally:
+               # Retirer la clé avant de réveiller les suivants : un appel ultérieur repart en amont
+               with self._lock:
+                   self._in_flight.pop(key, None)
+               call['done'].set()
+           return call['result']
+
+       # Attente bornée, erreur de l'appel amont propagée telle quelle
+       start = time.perf_counter()
+       completed = call['done'].wait(wait_timeout)
+       get_latency_stats().record(f"coalesced:{stage}", time.perf_counter() - start, completed)
+       if not completed:
+           with self._lock:
+               self.timeouts += 1
+           return None, "Timeout - API trop lente, veuillez réessayer"
+       return call['result']
+
+   def stats(self):
+       """Compteurs de regroupement"""
+       with self._lock:
+           return {
+               'leaders': self.leaders,
+               'followers': self.followers,
+               'timeouts': self.timeouts,
+               'in_flight': len(self._in_flight)
+           }
+
+@st.cache_resource(show_spinner=False)
+def get_single_flight():
+   """Registre des appels en vol partagé par processus"""
+   return SingleFlight()
+
+def max_api_call_duration(timeout):
+   """Durée maximale d'un appel amont : connexion + lecture par tentative, retries et backoff compris"""
+   attempt = min(API_CONNECT_TIMEOUT, timeout) + timeout
+   backoff = sum(API_RETRY_BACKOFF * 2 ** retry for retry in range(API_GET_RETRIES))
+   return attempt * (API_GET_RETRIES + 1) + backoff
+
 # Fonctions API avec gestion d'erreur robuste
 def safe_api_call(url, data=None, timeout=15):
-   """Appel API sécurisé avec gestion d'erreur robuste"""
+   """Appel API sécurisé ; GET et payloads identiques simultanés partagent un seul appel amont"""
+   key = (url, None if data is None else json.dumps(data, sort_keys=True, default=str))
+   return get_single_flight().do(
+       key,
+       lambda: _api_request(url, data, timeout),
+       # Les suivants attendent l'appel amont jusqu'au bout, retries compris
+       wait_timeout=max_api_call_duration(timeout),
+       stage=LatencyStats.endpoint_name(url)
+   )
+
+def _api_request(url, data=None, timeout=15):
+   """Appel API unitaire avec gestion d'erreur robuste"""
+   session = get_http_session()
+   endpoint = LatencyStats.endpoint_name(url)
+   # Timeouts séparés : connexion courte, lecture selon l'endpoint
+   timeouts = (min(API_CONNECT_TIMEOUT, timeout), timeout)
+   start = time.perf_counter()
+   ok = False
+   size = 0
    try:
        if data:
-           response = requests.post(url, json=data, timeout=timeout, 
-                                  headers={"Content-Type": "application/json"})
+           response = session.post(url, json=data, timeout=timeouts,
+                                   headers={"Content-Type": "application/json"})
        else:
-           response = requests.get(url, timeout=timeout)
-       
+           response = session.get(url, timeout=timeouts)
+       # Charge utile échangée (requête + réponse)
+       size = len(response.content) + len(response.request.body or b'')
+
        if response.status_code == 200:
+           ok = True
            return response.json(), None
        else:
            return None, f"Erreur API {response.status_code}: {response.text[:100]}"
@@ -273,33 +711,569 @@ def safe_api_call(url, data=None, timeout=15):
        return None, "Erreur connexion - API indisponible"
    except Exception as e:
        return None, f"Erreur réseau: {str(e)}"
-
-@st.cache_data(ttl=300)
-def test_api_connection():
-   """Test de connexion API avec cache TTL"""
+   finally:
+       get_latency_stats().record(endpoint, time.perf_counter() - start, ok, size)
+
+class StaleWhileRevalidate:
+   """Dernière valeur valide servie immédiatement après expiration, rafraîchie en arrière-plan"""
+
+   def __init__(self, name, loader, ttl, max_staleness, is_valid, on_error=lambda e: None, failure_ttl=FAILURE_TTL):
+       self.name = name
+       self.loader = loader
+       self.ttl = ttl
+       self.max_staleness = max_staleness
+       self.is_valid = is_valid
+       self.on_error = on_error  # valeur servie quand le chargeur lève une exception
+       self.failure_ttl = failure_ttl
+       self._lock = threading.Lock()
+       self._load_lock = threading.Lock()  # un seul chargement à la fois
+       self.value = None
+       self.fetched_at = None
+       self.refreshing = False
+       self.last_error_at = None
+       self.failed_value = None
+
+   def age(self):
+       """Âge de la dernière valeur valide en secondes (None si jamais chargée)"""
+       with self._lock:
+           return None if self.fetched_at is None else time.time() - self.fetched_at
+
+   def stale_since(self):
+       """Horodatage d'expiration si la valeur servie est périmée, sinon None"""
+       age = self.age()
+       if age is None or age < self.ttl:
+           return None
+       return self.fetched_at + self.ttl
+
+   def recent_failure(self):
+       """(True, valeur d'échec) si le dernier échec date de moins de failure_ttl, sinon (False, None)"""
+       with self._lock:
+           if self.last_error_at is not None and time.time() - self.last_error_at < self.failure_ttl:
+               return True, self.failed_value
+       return False, None
+
+   def _load(self):
+       """Charger une nouvelle valeur ; seule une valeur valide remplace la précédente"""
+       with self._load_lock:
+           # Un autre thread vient peut-être de recharger (ou d'échouer) pendant l'attente du verrou
+           age = self.age()
+           if age is not None and age < self.ttl:
+               return self.value
+           failed, failed_value = self.recent_failure()
+           if failed:
+               return failed_value
+           try:
+               value = self.loader()
+               valid = self.is_valid(value)
+           except Exception as e:
+               logger.warning("Revalidation %s impossible : %s", self.name, e)
+               value, valid = self.on_error(e), False
+           with self._lock:
+               if valid:
+                   self.value = value
+                   self.fetched_at = time.time()
+               else:
+                   # Échec resservi pendant failure_ttl : pas d'appel bloquant à chaque rerun
+                   self.last_error_at = time.time()
+                   self.failed_value = value
+           return value
+
+   def _refresh_in_background(self):
+       """Lancer au plus une revalidation en arrière-plan"""
+       with self._lock:
+           if self.refreshing:
+               return
+           self.refreshing = True
+
+       def refresh():
+           try:
+               self._load()
+           finally:
+               with self._lock:
+                   self.refreshing = False
+
+       # Thread de processus : aucun contexte de session lié (la session appelante peut se terminer avant lui)
+       threading.Thread(target=refresh, name=f"revalidate-{self.name}", daemon=True).start()
+
+   def get(self):
+       """Valeur fraîche, périmée (revalidation lancée), dernier échec récent, ou rechargée"""
+       age = self.age()
+       if age is not None and age < self.ttl:
+           return self.value
+       if age is not None and age < self.ttl + self.max_staleness:
+           self._refresh_in_background()
+           return self.value
+       failed, failed_value = self.recent_failure()
+       if failed:
+           return failed_value
+       # Aucune valeur ou au-delà de la péremption maximale : chargement bloquant
+       return self._load()
+
+   def invalidate(self):
+       """Oublier valeur et dernier échec : le prochain accès recharge de façon bloquante"""
+       with self._lock:
+           self.value = None
+           self.fetched_at = None
+           self.last_error_at = None
+           self.failed_value = None
+
+def fetch_api_health():
+   """Appel /health : (api_ok, api_info, api_error)"""
    result, error = safe_api_call(f"{API_URL}/health", timeout=10)
    if result:
        return True, result, None
    else:
        return False, None, error
 
-@st.cache_data(ttl=300)
-def call_prediction_api_cached(client_data_json):
-   """Appel API de prédiction avec cache"""
-   client_data = json.loads(client_data_json)
-   result, error = safe_api_call(f"{API_URL}/predict_dashboard", 
-                                 data=client_data, timeout=30)
+@st.cache_resource(show_spinner=False)
+def get_health_cache():
+   """Statut API partagé par processus (stale-while-revalidate)"""
+   return StaleWhileRevalidate("health", fetch_api_health, HEALTH_TTL, HEALTH_MAX_STALENESS,
+                               is_valid=lambda status: status[0],
+                               on_error=lambda e: (False, None, f"Erreur réseau: {str(e)}"))
+
+def test_api_connection():
+   """Test de connexion API : dernier statut valide servi pendant sa revalidation"""
+   return get_health_cache().get()
+
+def display_staleness(cache, label):
+   """Mention « périmé depuis » d'une donnée servie pendant sa revalidation"""
+   stale_since = cache.stale_since()
+   if stale_since is None:
+       return
+   message = f"⏳ {label} depuis {datetime.fromtimestamp(stale_since):%d/%m %H:%M} - actualisation en arrière-plan"
+   if cache.last_error_at is not None and cache.last_error_at > stale_since:
+       message += f" (dernier échec à {datetime.fromtimestamp(cache.last_error_at):%H:%M})"
+   st.caption(message)
+
+class SharedLRUCache:
+   """Cache LRU borné partagé entre sessions, avec TTL, version de modèle et compteurs"""
+
+   def __init__(self, max_size, ttl):
+       self._lock = threading.Lock()
+       self._entries = OrderedDict()
+       self.max_size = max_size
+       self.ttl = ttl
+       self.version = None
+       self.hits = 0
+       self.misses = 0
+       self.evictions = 0
+
+   def set_version(self, version):
+       """Invalider toutes les entrées si la version du modèle change"""
+       with self._lock:
+           if version != self.version:
+               self._entries.clear()
+               self.version = version
+
+   def get(self, key):
+       """Valeur en cache ou None (entrée expirée = absente)"""
+       with self._lock:
+           entry = self._entries.get(key)
+           if entry is None or time.monotonic() - entry[0] > self.ttl:
+               self._entries.pop(key, None)
+               self.misses += 1
+               return None
+           self._entries.move_to_end(key)
+           self.hits += 1
+           return entry[1]
+
+   def put(self, key, value):
+       """Ajouter une entrée, en évinçant la moins récemment utilisée si plein"""
+       with self._lock:
+           self._entries[key] = (time.monotonic(), value)
+           self._entries.move_to_end(key)
+           while len(self._entries) > self.max_size:
+               self._entries.popitem(last=False)
+               self.evictions += 1
+
+   def stats(self):
+       """Compteurs du cache"""
+       with self._lock:
+           lookups = self.hits + self.misses
+           return {
+               'hits': self.hits,
+               'misses': self.misses,
+               'evictions': self.evictions,
+               'size': len(self._entries),
+               'hit_rate': self.hits / lookups if lookups else 0.0
+           }
+
+@st.cache_resource(show_spinner=False)
+def get_prediction_cache():
+   """Cache des prédictions partagé par processus"""
+   return SharedLRUCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+def canonical_client_key(client_data):
+   """Clé canonique d'un profil client (valeurs arrondies aux pas du formulaire)"""
+   key = []
+   for feature in DASHBOARD_FEATURES:
+       value = client_data.get(feature)
+       if feature in CANONICAL_ROUNDING and value is not None:
+           value = round(float(value), CANONICAL_ROUNDING[feature])
+           if CANONICAL_ROUNDING[feature] == 0:
+               value = int(value)
+       key.append((feature, value))
+   return tuple(key)
+
+def get_model_version(api_info):
+   """Version du modèle annoncée par /health (None si non fournie)"""
+   if not api_info:
+       return None
+   return api_info.get('model_version', api_info.get('version'))
+
+def load_pickle(path):
+   """Charger un objet sérialisé (joblib si disponible, sinon pickle)"""
+   try:
+       import joblib
+       return joblib.load(path)
+   except ImportError:
+       import pickle
+       with open(path, 'rb') as file:
+           return pickle.load(file)
+
+class LocalScoringEngine:
+   """Scoring en mémoire des 10 variables dashboard, réponse au format /predict_dashboard"""
+
+   def __init__(self, model, threshold, version=None):
+       self.model = model
+       self.threshold = float(threshold)
+       self.version = version
+       self.features = list(getattr(model, 'feature_names_in_', DASHBOARD_FEATURES))
+       # Booster LightGBM : prédiction directe sur tableau NumPy (pas de validation pandas)
+       self.booster = getattr(model, 'booster_', None)
+
+   def encode(self, clients):
+       """Matrice de features (une ligne par client, encodage identique à la population)"""
+       for client in clients:
+           # Une variable absente n'est jamais remplacée par 0 : le score serait faux sans erreur visible
+           missing = [feature for feature in self.features if client.get(feature) is None]
+           if missing:
+               raise ValueError(f"Variables manquantes pour le moteur local : {', '.join(missing)}")
+       return np.array([
+           [float(convert_client_value(client[feature], feature)) for feature in self.features]
+           for client in clients
+       ], dtype=np.float64)
+
+   def predict_proba(self, matrix):
+       """Probabilités de défaut pour une matrice de features"""
+       if self.booster is not None:
+           return self.booster.predict(matrix)
+       if hasattr(self.model, 'feature_names_in_'):
+           matrix = pd.DataFrame(matrix, columns=self.features)
+       return self.model.predict_proba(matrix)[:, 1]
+
+   def contributions(self, matrix):
+       """Contributions par variable (None si le modèle ne les fournit pas)"""
+       if self.booster is None:
+           return None
+       return self.booster.predict(matrix, pred_contrib=True)[:, :len(self.features)]
+
+   def risk_level(self, probability):
+       """Niveau de risque selon les zones de la jauge"""
+       if probability < self.threshold:
+           return "Faible"
+       if probability < self.threshold * 2.5:
+           return "Modéré"
+       if probability < self.threshold * 5:
+           return "Élevé"
+       return "Très élevé"
+
+   def build_result(self, probability, contributions=None):
+       """Réponse au format consommé par display_prediction_result/display_feature_importance"""
+       decision = "REFUSE" if probability >= self.threshold else "ACCORDE"
+       top_features = []
+       if contributions is not None:
+           order = np.argsort(-np.abs(contributions))[:LOCAL_TOP_FEATURES]
+           top_features = [
+               {'feature': self.features[i], 'shap_value': float(contributions[i])}
+               for i in order
+           ]
+       return {
+           'prediction': {
+               'probability': float(probability),
+               'decision': decision,
+               'decision_fr': "Refusé" if decision == "REFUSE" else "Accordé",
+               'risk_level': self.risk_level(probability),
+               'threshold': self.threshold
+           },
+           'explanation': {'top_features': top_features},
+           'source': 'local'
+       }
+
+   def predict_batch(self, clients):
+       """Scorer plusieurs clients en un seul appel vectorisé"""
+       start = time.perf_counter()
+       probabilities = self.predict_proba(self.encode(clients))
+       get_latency_stats().record('local:predict_batch', time.perf_counter() - start)
+       return probabilities
+
+   def predict(self, client_data):
+       """Scorer un client en mémoire"""
+       start = time.perf_counter()
+       try:
+           matrix = self.encode([client_data])
+       except ValueError as e:
+           return None, str(e)
+       probability = self.predict_proba(matrix)[0]
+       contributions = self.contributions(matrix)
+       result = self.build_result(probability, None if contributions is None else contributions[0])
+       get_latency_stats().record('local:predict', time.perf_counter() - start)
+       return result, None
+
+@st.cache_resource(show_spinner=False)
+def load_local_engine():
+   """Moteur local chargé une fois par processus (None si modèle absent)"""
+   if not os.path.exists(LOCAL_MODEL_PATH) or not os.path.exists(LOCAL_THRESHOLD_PATH):
+       return None, "Modèle local introuvable"
+   try:
+       model = load_pickle(LOCAL_MODEL_PATH)
+       threshold = load_pickle(LOCAL_THRESHOLD_PATH)
+       version = LOCAL_MODEL_VERSION
+       if isinstance(threshold, dict):
+           version = threshold.get('model_version', version)
+           threshold = threshold.get('threshold', threshold.get('optimal_threshold'))
+       return LocalScoringEngine(model, threshold, version), None
+   except Exception as e:
+       return None, f"Chargement du modèle local impossible : {str(e)}"
+
+def score_client(client_data, mode=None):
+   """Scorer un client selon le moteur choisi (API avec repli local, ou local)"""
+   engine, _ = load_local_engine()
+   mode = mode or st.session_state.get('scoring_mode')
+   if engine is not None and mode == 'local':
+       result, error = engine.predict(client_data)
+       if result is not None:
+           return result, None
+       # Profil incomplet pour le moteur local : l'API prend le relais
+
+   result, error = call_prediction_api_cached(client_data)
+   if result is None and engine is not None and mode != 'local':
+       # API lente ou indisponible : le moteur local prend le relais
+       local_result, _ = engine.predict(client_data)
+       if local_result is not None:
+           return local_result, None
    return result, error
 
-@st.cache_data(ttl=3600)
-def get_population_distribution_cached(variable):
-   """Distribution population avec cache 1h"""
-   result, error = safe_api_call(f"{API_URL}/population/{variable}", timeout=15)
-   if result:
-       return result
-   else:
-       st.error(f"Erreur chargement {variable}: {error}")
+class LocalExplainer:
+   """Contributions SHAP exactes des 10 variables (TreeExplainer, sinon pred_contrib LightGBM)"""
+
+   def __init__(self, engine):
+       self.engine = engine
+       self.tree_explainer = None
+       try:
+           import shap
+           self.tree_explainer = shap.TreeExplainer(engine.model)
+       except Exception:
+           # shap absent ou modèle non arborescent : contributions natives du booster
+           if engine.booster is None:
+               raise
+
+   def shap_values(self, matrix):
+       """Matrice (clients x variables) des contributions"""
+       if self.tree_explainer is None:
+           return self.engine.contributions(matrix)
+       values = self.tree_explainer.shap_values(matrix)
+       # Classification binaire : contributions de la classe « défaut »
+       if isinstance(values, list):
+           values = values[1]
+       if np.ndim(values) == 3:
+           values = values[:, :, 1]
+       return np.asarray(values)
+
+@st.cache_resource(show_spinner=False)
+def load_local_explainer():
+   """Explicateur local chargé une fois par processus (None sans modèle local)"""
+   engine, _ = load_local_engine()
+   if engine is None:
        return None
+   try:
+       return LocalExplainer(engine)
+   except Exception:
+       return None
+
+@st.cache_resource(show_spinner=False)
+def get_explanation_cache():
+   """Cache des explications locales partagé par processus"""
+   return SharedLRUCache(EXPLANATION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+def explain_clients(clients):
+   """Contributions exactes {variable: valeur} de plusieurs clients en un seul calcul (None par client sinon)"""
+   explainer = load_local_explainer()
+   if explainer is None or not clients:
+       return [None] * len(clients)
+   try:
+       matrix = explainer.engine.encode(clients)
+   except ValueError:
+       return [None] * len(clients)
+   start = time.perf_counter()
+   values = explainer.shap_values(matrix)
+   get_latency_stats().record('local:explain', time.perf_counter() - start)
+   return [dict(zip(explainer.engine.features, map(float, row))) for row in values]
+
+def explain_client(client_data):
+   """Contributions exactes d'un profil saisi (cache partagé) ou None si l'explicateur local est indisponible"""
+   cache = get_explanation_cache()
+   key = canonical_client_key(client_data)
+   explanation = cache.get(key)
+   if explanation is None:
+       explanation = explain_clients([client_data])[0]
+       if explanation is not None:
+           cache.put(key, explanation)
+   return explanation
+
+def local_model_matches_api():
+   """Vrai si le modèle local est la version servie par l'API (ses explications valent pour les scores API)"""
+   engine, _ = load_local_engine()
+   if engine is None or engine.version is None:
+       return False
+   _, api_info, _ = test_api_connection()
+   return engine.version == get_model_version(api_info)
+
+def can_explain_locally(result):
+   """Explication locale exacte possible : score produit localement, ou même version de modèle que l'API"""
+   return result.get('source') == 'local' or local_model_matches_api()
+
+def top_factors_text(contributions, count=BATCH_TOP_FACTORS):
+   """Principaux facteurs d'une explication, du plus influent au moins influent"""
+   ranked = sorted(contributions.items(), key=lambda item: -abs(item[1]))[:count]
+   return ", ".join(f"{FEATURE_TRANSLATIONS.get(feature, feature)} ({value:+.3f})" for feature, value in ranked)
+
+@st.cache_resource(show_spinner=False)
+def load_global_explanations():
+   """Explications globales mappées en mémoire au démarrage (None si non calculées)"""
+   metadata_path = os.path.join(GLOBAL_EXPLANATIONS_DIR, "metadata.json")
+   if not os.path.exists(metadata_path):
+       return None
+   with open(metadata_path, encoding='utf-8') as file:
+       metadata = json.load(file)
+   return {
+       'metadata': metadata,
+       'shap_values': np.load(os.path.join(GLOBAL_EXPLANATIONS_DIR, "shap_values.npy"), mmap_mode='r'),
+       'feature_values': np.load(os.path.join(GLOBAL_EXPLANATIONS_DIR, "feature_values.npy"), mmap_mode='r')
+   }
+
+@st.cache_resource(show_spinner=False)
+@timed_stage('figure:build_global_importance_figures')
+def build_global_importance_figures():
+   """Graphiques d'importance globale construits une seule fois par processus"""
+   explanations = load_global_explanations()
+   if explanations is None:
+       return None
+   metadata = explanations['metadata']
+   features = metadata['features']
+   mean_abs_shap = np.array(metadata['mean_abs_shap'])
+   order = np.argsort(mean_abs_shap)  # croissant : variable la plus importante en haut
+   labels = [FEATURE_TRANSLATIONS.get(features[i], features[i]) for i in order]
+
+   # Importance moyenne |SHAP|
+   fig_importance = go.Figure(go.Bar(
+       x=mean_abs_shap[order],
+       y=labels,
+       orientation='h',
+       marker_color='#3b82f6',
+       hovertemplate="%{y} : %{x:.4f}<extra></extra>"
+   ))
+   fig_importance.update_layout(
+       height=450,
+       title="Importance globale (moyenne des |valeurs SHAP|)",
+       xaxis_title="Impact moyen sur la prédiction",
+       yaxis_title="Variables"
+   )
+
+   # Résumé beeswarm : une ligne par variable, couleur = rang de la valeur dans l'échantillon
+   rng = np.random.default_rng(0)
+   shap_values = explanations['shap_values']
+   feature_values = explanations['feature_values']
+   sample_size = shap_values.shape[0]
+   rows = rng.choice(sample_size, size=min(GLOBAL_BEESWARM_POINTS, sample_size), replace=False)
+   fig_beeswarm = go.Figure()
+   for position, i in enumerate(order):
+       values = np.asarray(feature_values[rows, i])
+       ranks = pd.Series(values).rank(pct=True).to_numpy()
+       fig_beeswarm.add_trace(go.Scatter(
+           x=np.asarray(shap_values[rows, i]),
+           y=position + rng.uniform(-0.3, 0.3, len(rows)),
+           mode='markers',
+           marker={'size': 5, 'color': ranks, 'colorscale': 'Bluered', 'cmin': 0, 'cmax': 1,
+                   'showscale': position == 0, 'colorbar': {'title': 'Valeur', 'tickvals': [0, 1], 'ticktext': ['Basse', 'Haute']}},
+           name=labels[position],
+           hovertemplate=f"{labels[position]}<br>SHAP = %{{x:.4f}}<extra></extra>"
+       ))
+   fig_beeswarm.add_vline(x=0, line_dash="dash", line_color="gray")
+   fig_beeswarm.update_layout(
+       height=500,
+       title="Distribution des contributions SHAP (échantillon population)",
+       xaxis_title="Valeur SHAP (impact sur le risque)",
+       yaxis={'tickmode': 'array', 'tickvals': list(range(len(labels))), 'ticktext': labels},
+       showlegend=False
+   )
+   return {'importance': fig_importance, 'beeswarm': fig_beeswarm, 'labels': labels[::-1], 'metadata': metadata}
+
+@timed_stage('render:display_global_importance')
+def display_global_importance():
+   """Panneau d'importance globale (pré-calculée hors ligne)"""
+   figures = build_global_importance_figures()
+   if figures is None:
+       st.info("Explications globales non calculées - lancer tools/build_global_explanations.py")
+       return
+
+   metadata = figures['metadata']
+   col1, col2 = st.columns(2)
+   with col1:
+       show_plotly_chart(figures['importance'], use_container_width=True, config=PLOTLY_CONFIG)
+   with col2:
+       show_plotly_chart(figures['beeswarm'], use_container_width=True, config=PLOTLY_CONFIG)
+
+   # WCAG 1.1.1 : Texte alternatif pour l'importance globale
+   st.markdown(f"""
+   **Description graphique :** À gauche, importance moyenne de chaque variable sur {metadata['sample_size']:,} clients de la population ;
+   les trois plus influentes sont {', '.join(figures['labels'][:3])}. À droite, chaque point est un client : sa position indique
+   l'impact de la variable sur son risque (à droite : augmente le risque), sa couleur la valeur de la variable (bleu : basse, rouge : haute).
+   """)
+   st.caption(f"Calcul hors ligne du {metadata['created_at']} - modèle {metadata.get('model', 'inconnu')}")
+
+def batch_scoring_engine(mode=None):
+   """Moteur local si disponible et choisi comme moteur de scoring, sinon None (API)"""
+   engine, _ = load_local_engine()
+   mode = mode or st.session_state.get('scoring_mode')
+   return engine if mode == 'local' else None
+
+def score_clients_batch(clients, mode=None, use_cache=True):
+   """Probabilités de plusieurs profils selon le moteur choisi : un appel vectorisé local, sinon appels API concurrents"""
+   engine = batch_scoring_engine(mode)
+   if engine is not None:
+       try:
+           return engine.predict_batch(clients), engine.threshold, 'local'
+       except ValueError as e:
+           # Profils incomplets pour le moteur local : appels API
+           logger.info("Scoring local impossible, repli API : %s", e)
+
+   # Profils synthétiques (grilles) : hors du cache LRU partagé des prédictions
+   predict = call_prediction_api_cached if use_cache else call_prediction_api
+   results = run_concurrently(
+       [(predict, (client,)) for client in clients],
+       max_concurrency=BATCH_MAX_WORKERS
+   )
+   probabilities = np.array([
+       result['prediction'].get('probability', np.nan) if result else np.nan
+       for result, _ in results
+   ])
+   thresholds = [result['prediction'].get('threshold') for result, _ in results if result]
+   return probabilities, (thresholds[0] if thresholds else None), 'api'
+
+def call_prediction_api_cached(client_data):
+   """Appel API de prédiction avec cache LRU partagé (profils identiques)"""
+   cache = get_prediction_cache()
+   key = canonical_client_key(client_data)
+   cached_result = cache.get(key)
+   if cached_result is not None:
+       return cached_result, None
+
+   result, error = call_prediction_api(client_data)
+   if result:
+       cache.put(key, result)
+   return result, error
 
 # Fonctions API sans cache pour contrôle utilisateur
 def call_prediction_api(client_data):
@@ -325,12 +1299,459 @@ def get_bivariate_data(var1, var2):
                                  timeout=20)
    return result
 
+# Chargement groupé de la population
+
+def fetch_population_batch(variables):
+   """Récupérer les distributions de plusieurs variables en un aller-retour"""
+   variables = list(variables)
+
+   # Route batch : une seule requête pour toutes les variables
+   result, error = safe_api_call(f"{API_URL}{POPULATION_BATCH_ROUTE}",
+                                 data={"variables": variables}, timeout=30)
+   if result and isinstance(result.get('distributions'), dict):
+       return result['distributions'], {}
+
+   # Pas de route batch : appels /population/{variable} en parallèle
+   responses = run_concurrently(
+       [(safe_api_call, (f"{API_URL}/population/{variable}", None, 15)) for variable in variables],
+       max_concurrency=POPULATION_FETCH_WORKERS
+   )
+
+   distributions, errors = {}, {}
+   for variable, (distribution, error) in zip(variables, responses):
+       if distribution:
+           distributions[variable] = distribution
+       else:
+           errors[variable] = error
+   return distributions, errors
+
+def write_npy_atomic(path, values):
+   """Écriture atomique d'un tableau (plusieurs processus peuvent partager le dossier)"""
+   tmp_path = f"{path}.{os.getpid()}.tmp"
+   with open(tmp_path, 'wb') as tmp_file:
+       np.save(tmp_file, values)
+   os.replace(tmp_path, path)
+
+class PopulationStore:
+   """Store population en lecture seule : un tableau NumPy mappé en mémoire par variable"""
+
+   def __init__(self, columns, version, errors=None, sorted_columns=None, histograms=None, snapshot=None):
+       self.columns = columns
+       self.version = version
+       self.errors = errors or {}
+       self.sorted_columns = sorted_columns or {}
+       self.histograms = histograms or {}
+       self.snapshot = snapshot
+
+   def __contains__(self, variable):
+       return variable in self.columns
+
+   @staticmethod
+   def encode_column(values, variable):
+       """Encoder une distribution : int8 pour les catégorielles, float32 sinon"""
+       values = np.asarray(convert_categorical_values(values, variable), dtype=np.float64)
+       if variable in CATEGORICAL_FEATURES:
+           encoded = np.full(values.shape, CATEGORICAL_MISSING, dtype=np.int8)
+           valid = ~np.isnan(values)
+           encoded[valid] = values[valid]
+           return encoded
+       return values.astype(np.float32)
+
+   @staticmethod
+   def open_version(version, variables, directory=POPULATION_STORE_DIR, arrays=None, sorted_arrays=None):
+       """Mapper en mémoire les fichiers d'une version (écrits d'abord s'ils manquent)"""
+       version_dir = os.path.join(directory, version)
+       os.makedirs(version_dir, exist_ok=True)
+       # Date de dernière utilisation : protège la version du nettoyage des autres processus
+       os.utime(version_dir)
+       columns, sorted_columns = {}, {}
+       for variable in variables:
+           path = os.path.join(version_dir, f"{variable}.npy")
+           if not os.path.exists(path):
+               write_npy_atomic(path, arrays[variable])
+           columns[variable] = np.load(path, mmap_mode='r')
+
+           sorted_path = os.path.join(version_dir, f"{variable}.sorted.npy")
+           if sorted_arrays is not None and not os.path.exists(sorted_path):
+               write_npy_atomic(sorted_path, sorted_arrays[variable])
+           if os.path.exists(sorted_path):
+               sorted_columns[variable] = np.load(sorted_path, mmap_mode='r')
+
+       PopulationStore.collect_old_versions(version, directory)
+       return columns, sorted_columns
+
+   @staticmethod
+   def collect_old_versions(current_version, directory=POPULATION_STORE_DIR):
+       """Supprimer les versions anciennes et inutilisées depuis le délai de grâce (dossier partagé entre processus)"""
+       entries = []
+       for name in os.listdir(directory):
+           path = os.path.join(directory, name)
+           try:
+               if os.path.isdir(path):
+                   entries.append((os.path.getmtime(path), name, path))
+           except OSError:
+               continue  # supprimée entre-temps par un autre processus
+       entries.sort(reverse=True)
+
+       now = time.time()
+       # Versions récentes conservées : en cours d'écriture ou mappées par un autre processus
+       for mtime, name, path in entries[POPULATION_STORE_KEEP_VERSIONS:]:
+           if name != current_version and now - mtime > POPULATION_STORE_GRACE_PERIOD:
+               shutil.rmtree(path, ignore_errors=True)
+
+   @staticmethod
+   def version_is_complete(version, variables, directory=POPULATION_STORE_DIR):
+       """Vrai si toutes les colonnes (et index triés) de la version sont déjà sur disque"""
+       version_dir = os.path.join(directory, version)
+       return all(
+           os.path.exists(os.path.join(version_dir, f"{variable}{suffix}.npy"))
+           for variable in variables for suffix in ('', '.sorted')
+       )
+
+   @classmethod
+   def from_distributions(cls, distributions, errors, directory=POPULATION_STORE_DIR):
+       """Écrire les colonnes sur disque puis les relire en memory-map"""
+       encoded = {
+           variable: cls.encode_column(distributions[variable].get('values', []), variable)
+           for variable in DASHBOARD_FEATURES if variable in distributions
+       }
+       # Un fichier vide ne peut pas être mappé en mémoire
+       encoded = {variable: values for variable, values in encoded.items() if len(values) > 0}
+       if not encoded:
+           # Chargement en échec : aucune version écrite, la précédente reste sur disque
+           return cls({}, None, errors)
+
+       # Version = empreinte du contenu : même population, mêmes fichiers
+       digest = hashlib.sha1()
+       for variable, values in encoded.items():
+           digest.update(variable.encode())
+           digest.update(values.tobytes())
+       version = digest.hexdigest()[:12]
+
+       columns, _ = cls.open_version(version, list(encoded), directory, arrays=encoded)
+       return cls(columns, version, errors)
+
+   @classmethod
+   def from_snapshot(cls, path, directory=POPULATION_STORE_DIR):
+       """Store depuis un snapshot Parquet : décodé une seule fois, puis mappé en mémoire"""
+       import pyarrow.parquet as pq
+
+       metadata = json.loads(pq.read_schema(path).metadata[SNAPSHOT_METADATA_KEY])
+       version = f"snapshot-{metadata['version']}"
+       variables = [variable for variable in metadata['features'] if variable in DASHBOARD_FEATURES]
+
+       arrays, sorted_arrays = None, None
+       if not cls.version_is_complete(version, variables, directory):
+           table = pq.read_table(path, memory_map=True)
+           arrays, sorted_arrays = {}, {}
+           for variable in variables:
+               count = metadata['row_counts'][variable]
+               column = table.column(variable).slice(0, count)
+               missing = CATEGORICAL_MISSING if variable in CATEGORICAL_FEATURES else np.nan
+               arrays[variable] = column.fill_null(missing).to_numpy()
+               sorted_arrays[variable] = table.column(f"{SNAPSHOT_SORTED_PREFIX}{variable}").drop_null().to_numpy()
+
+       columns, sorted_columns = cls.open_version(version, variables, directory, arrays, sorted_arrays)
+       histograms = {
+           variable: {key: np.asarray(values) for key, values in histogram.items()}
+           for variable, histogram in metadata['histograms'].items()
+       }
+       snapshot = {key: metadata[key] for key in ('version', 'created_at', 'source')}
+       return cls(columns, version, sorted_columns=sorted_columns, histograms=histograms, snapshot=snapshot)
+
+   def valid_mask(self, variable, length=None):
+       """Masque des valeurs renseignées"""
+       values = self.columns[variable][:length]
+       if values.dtype == np.int8:
+           return values != CATEGORICAL_MISSING
+       return ~np.isnan(values)
+
+   def column(self, variable):
+       """Valeurs renseignées d'une variable (vue sans copie si aucune valeur manquante)"""
+       values = self.columns[variable]
+       mask = self.valid_mask(variable)
+       return values if mask.all() else values[mask]
+
+   def pair(self, var1, var2):
+       """Couples de valeurs alignés par position, renseignés pour les deux variables"""
+       length = min(len(self.columns[var1]), len(self.columns[var2]))
+       x_data = self.columns[var1][:length]
+       y_data = self.columns[var2][:length]
+       mask = self.valid_mask(var1, length) & self.valid_mask(var2, length)
+       if mask.all():
+           return x_data, y_data
+       return x_data[mask], y_data[mask]
+
+def find_population_snapshot():
+   """Snapshot Parquet le plus récent (noms horodatés) ou None"""
+   if not os.path.isdir(POPULATION_SNAPSHOT_DIR):
+       return None
+   snapshots = sorted(name for name in os.listdir(POPULATION_SNAPSHOT_DIR) if name.endswith('.parquet'))
+   return os.path.join(POPULATION_SNAPSHOT_DIR, snapshots[-1]) if snapshots else None
+
+@st.cache_resource(show_spinner=False)
+def load_snapshot_metadata(path):
+   """Métadonnées d'un snapshot (lecture du seul schéma Parquet)"""
+   import pyarrow.parquet as pq
+   metadata = json.loads(pq.read_schema(path).metadata[SNAPSHOT_METADATA_KEY])
+   return {key: metadata[key] for key in ('version', 'created_at', 'source')}
+
+def load_population_store():
+   """Store population (snapshot local si présent, sinon API)"""
+   snapshot_path = find_population_snapshot()
+   if snapshot_path is not None:
+       return PopulationStore.from_snapshot(snapshot_path)
+   distributions, errors = fetch_population_batch(DASHBOARD_FEATURES)
+   return PopulationStore.from_distributions(distributions, errors)
+
+@st.cache_resource(show_spinner=False)
+def get_population_cache():
+   """Store population partagé par processus (stale-while-revalidate, revalidé après 1h)"""
+   return StaleWhileRevalidate("population", load_population_store, POPULATION_TTL, POPULATION_MAX_STALENESS,
+                               is_valid=lambda store: bool(store.columns))
+
+def get_population_store():
+   """Store population ou None si aucune variable n'a pu être chargée"""
+   store = get_population_cache().get()
+   if store is None or not store.columns:
+       # Échec resservi pendant FAILURE_TTL, puis le prochain accès réessaie
+       return None, {} if store is None else store.errors
+   return store, store.errors
+
+# Percentiles vectorisés
+
+class PercentileIndex:
+   """Colonnes triées une seule fois : rang d'un client en O(log n)"""
+
+   def __init__(self, store):
+       self.version = store.version
+       # Index triés du snapshot réutilisés tels quels, sinon tri au premier accès
+       self.sorted_columns = {
+           variable: store.sorted_columns[variable] if variable in store.sorted_columns
+           else np.sort(store.column(variable))
+           for variable in store.columns
+       }
+
+   @timed_stage('calcul:percentile')
+   def percentile(self, variable, value):
+       """Pourcentage de la population dont la valeur est <= value"""
+       sorted_values = self.sorted_columns.get(variable)
+       if sorted_values is None or len(sorted_values) == 0:
+           return None
+       rank = np.searchsorted(sorted_values, value, side='right')
+       return float(rank) / len(sorted_values) * 100
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+@timed_stage('calcul:percentile_index')
+def load_percentile_index(_store, version):
+   """Index de percentiles partagé, reconstruit à chaque nouvelle version du store"""
+   return PercentileIndex(_store)
+
+def get_percentile_index():
+   """Index de percentiles du store courant ou None si population indisponible"""
+   store, _ = get_population_store()
+   if store is None:
+       return None
+   return load_percentile_index(store, store.version)
+
+# Histogrammes pré-calculés
+
+@timed_stage('calcul:histogram')
+def compute_histogram(values, variable):
+   """Barres d'histogramme (calcul partagé avec les snapshots hors ligne)"""
+   return histogram_bars(values, variable, POPULATION_HISTOGRAM_BINS)
+
+@st.cache_data(show_spinner=False, max_entries=50)
+def load_population_histogram(_store, version, variable):
+   """Histogramme d'une variable, calculé une fois par version du store"""
+   if variable in _store.histograms:
+       return _store.histograms[variable]
+   return compute_histogram(_store.column(variable), variable)
+
+def get_population_histogram(variable):
+   """Histogramme pré-calculé d'une variable ou None si population indisponible"""
+   store, _ = get_population_store()
+   if store is None or variable not in store:
+       return None
+   return load_population_histogram(store, store.version, variable)
+
+def warm_population_data():
+   """Précharger store, index de percentiles et histogrammes (tâche de fond)"""
+   try:
+       store, _ = get_population_store()
+       if store is not None:
+           get_percentile_index()
+           for variable in store.columns:
+               get_population_histogram(variable)
+       return store is not None
+   except Exception as e:
+       # Préchargement facultatif : un échec ne doit jamais remonter jusqu'à la prédiction
+       logger.warning("Préchargement population impossible : %s", e)
+       return False
+
+@st.cache_resource
+def get_background_executor():
+   """Pool partagé par processus pour les préchargements non attendus"""
+   return ThreadPoolExecutor(max_workers=1, thread_name_prefix="background")
+
+def start_population_warm_up():
+   """Lancer le préchargement population sans l'attendre (aucun contexte de session lié)"""
+   get_background_executor().submit(warm_population_data)
+
+# Densité bi-variée agrégée
+
+def density_bin_edges(values, variable):
+   """Bornes de la grille : une cellule par modalité pour les catégorielles"""
+   if variable in CATEGORICAL_FEATURES:
+       return np.array([-0.5, 0.5, 1.5])
+   return np.histogram_bin_edges(values, bins=BIVARIATE_DENSITY_BINS)
+
+@timed_stage('calcul:density_grid')
+def compute_density_grid(x_data, y_data, var1, var2):
+   """Grille 2D de comptages (np.histogram2d) pour une paire de variables"""
+   x_data = np.asarray(x_data)
+   y_data = np.asarray(y_data)
+   x_edges = density_bin_edges(x_data, var1)
+   y_edges = density_bin_edges(y_data, var2)
+   counts, x_edges, y_edges = np.histogram2d(x_data, y_data, bins=[x_edges, y_edges])
+
+   # Cellules vides transparentes
+   counts = np.where(counts > 0, counts, np.nan)
+   return {
+       'x_centers': (x_edges[:-1] + x_edges[1:]) / 2,
+       'y_centers': (y_edges[:-1] + y_edges[1:]) / 2,
+       'counts': counts.T
+   }
+
+@st.cache_data(show_spinner=False, max_entries=50)
+def load_bivariate_density(_store, version, var1, var2):
+   """Grille de densité d'une paire, calculée une fois par version du store"""
+   x_data, y_data = _store.pair(var1, var2)
+   return compute_density_grid(x_data, y_data, var1, var2)
+
+def get_bivariate_density(var1, var2):
+   """Grille de densité pré-calculée ou None si population indisponible"""
+   store, _ = get_population_store()
+   if store is None or var1 not in store or var2 not in store:
+       return None
+   return load_bivariate_density(store, store.version, var1, var2)
+
+# Corrélations pré-calculées
+
+def pearson_correlation(x_data, y_data):
+   """Coefficient de Pearson (NaN si variance nulle ou moins de 2 points)"""
+   x_data = np.asarray(x_data, dtype=np.float64)
+   y_data = np.asarray(y_data, dtype=np.float64)
+   if len(x_data) < 2:
+       return np.nan
+   x_centered = x_data - x_data.mean()
+   y_centered = y_data - y_data.mean()
+   denominator = np.sqrt(np.dot(x_centered, x_centered) * np.dot(y_centered, y_centered))
+   return float(np.dot(x_centered, y_centered) / denominator) if denominator > 0 else np.nan
+
+class CorrelationSummary:
+   """Matrices Pearson/Spearman et effectifs de toutes les paires, calculées une fois"""
+
+   def __init__(self, store):
+       self.version = store.version
+       self.features = [variable for variable in DASHBOARD_FEATURES if variable in store]
+       self.index = {variable: i for i, variable in enumerate(self.features)}
+
+       size = len(self.features)
+       self.pearson = np.full((size, size), np.nan)
+       self.spearman = np.full((size, size), np.nan)
+       self.sample_sizes = np.zeros((size, size), dtype=np.int64)
+
+       # Matrices symétriques : seul le triangle supérieur est calculé
+       for i, var1 in enumerate(self.features):
+           for j in range(i, size):
+               var2 = self.features[j]
+               x_data, y_data = store.pair(var1, var2)
+               pearson = pearson_correlation(x_data, y_data)
+               # Spearman = Pearson sur les rangs (ex-aequo : rang moyen)
+               spearman = pearson_correlation(
+                   pd.Series(x_data).rank().to_numpy(),
+                   pd.Series(y_data).rank().to_numpy()
+               )
+               self.pearson[i, j] = self.pearson[j, i] = pearson
+               self.spearman[i, j] = self.spearman[j, i] = spearman
+               self.sample_sizes[i, j] = self.sample_sizes[j, i] = len(x_data)
+
+   def pair_stats(self, var1, var2):
+       """Statistiques d'une paire en O(1), identiques pour (A, B) et (B, A)"""
+       if var1 not in self.index or var2 not in self.index:
+           return None
+       i, j = self.index[var1], self.index[var2]
+       return {
+           'pearson': self.pearson[i, j],
+           'spearman': self.spearman[i, j],
+           'n': int(self.sample_sizes[i, j])
+       }
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+@timed_stage('calcul:correlation_summary')
+def load_correlation_summary(_store, version):
+   """Matrices de corrélation partagées, recalculées à chaque nouvelle version du store"""
+   return CorrelationSummary(_store)
+
+def get_correlation_summary():
+   """Matrices de corrélation du store courant ou None si population indisponible"""
+   store, _ = get_population_store()
+   if store is None:
+       return None
+   return load_correlation_summary(store, store.version)
+
+@timed_stage('render:display_correlation_overview')
+def display_correlation_overview():
+   """Carte de chaleur des corrélations entre toutes les variables"""
+   summary = get_correlation_summary()
+   if summary is None:
+       st.warning("Données population indisponibles")
+       return
+
+   method = st.radio(
+       "Méthode",
+       ["Pearson", "Spearman"],
+       horizontal=True,
+       key="correlation_method",
+       help="Pearson : relation linéaire. Spearman : relation monotone (basée sur les rangs)."
+   )
+   matrix = summary.pearson if method == "Pearson" else summary.spearman
+   labels = [FEATURE_TRANSLATIONS.get(variable, variable) for variable in summary.features]
+
+   fig = go.Figure(go.Heatmap(
+       x=labels,
+       y=labels,
+       z=matrix,
+       zmin=-1,
+       zmax=1,
+       colorscale='RdBu_r',
+       texttemplate="%{z:.2f}",
+       customdata=summary.sample_sizes,
+       hovertemplate="%{y} / %{x}<br>r = %{z:.3f}<br>n = %{customdata:,}<extra></extra>",
+       colorbar={'title': 'r'}
+   ))
+   fig.update_layout(height=550, title=f"Matrice de corrélation ({method})", yaxis={'autorange': 'reversed'})
+   show_plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+
+   # WCAG 1.1.1 : Texte alternatif pour la matrice
+   masked = np.abs(np.where(np.eye(len(matrix), dtype=bool), np.nan, matrix))
+   if np.isfinite(masked).any():
+       i, j = np.unravel_index(np.nanargmax(masked), masked.shape)
+       strongest = f"La corrélation la plus forte relie {labels[i]} et {labels[j]} (r = {matrix[i, j]:.2f})."
+   else:
+       strongest = ""
+   st.markdown(f"""
+   **Description graphique :** Matrice de corrélation ({method}) entre les {len(labels)} variables du dashboard.
+   Rouge : corrélation positive, bleu : corrélation négative, blanc : absence de corrélation. {strongest}
+   """)
+
 # Fonctions utilitaires
 
 def convert_categorical_values(values, variable_name):
-   """Conversion centralisée pour variables catégorielles"""
-   if variable_name == 'NAME_EDUCATION_TYPE_Higher_education':
-       return [1 if v else 0 for v in values]
+   """Conversion centralisée pour variables catégorielles (encodeur partagé avec les snapshots, manquant = NaN)"""
+   if variable_name in CATEGORICAL_FEATURES:
+       return encode_categorical_values(values, variable_name)
    return values
 
 def convert_client_value(client_value, variable_name):
@@ -341,8 +1762,96 @@ def convert_client_value(client_value, variable_name):
        return 1 if client_value == 1 else 0
    return client_value
 
+def employment_years_to_days(employment_years):
+   """Conversion ancienneté : années vers jours négatifs (format API)"""
+   return -int(float(employment_years) * 365.25)
+
+def normalize_gender(value):
+   """Conversion genre vers le format API (M/F)"""
+   normalized = str(value).strip().upper()
+   if normalized in ('M', 'HOMME', 'H', '1', '1.0'):
+       return 'M'
+   if normalized in ('F', 'FEMME', '0', '0.0'):
+       return 'F'
+   raise ValueError(f"genre invalide : {value}")
+
+def normalize_education(value):
+   """Conversion éducation supérieure vers le format API (0/1)"""
+   normalized = str(value).strip().upper()
+   if normalized in ('1', '1.0', 'OUI', 'TRUE'):
+       return 1
+   if normalized in ('0', '0.0', 'NON', 'FALSE'):
+       return 0
+   raise ValueError(f"éducation invalide : {value}")
+
+# Scoring par lot
+
+@timed_stage('pandas:prepare_batch_clients')
+def prepare_batch_clients(applicants_df):
+   """Valider un fichier de demandeurs et le convertir au format API"""
+   # Ancienneté en années acceptée à la place de DAYS_EMPLOYED (comme le formulaire)
+   required = [f for f in DASHBOARD_FEATURES if f != 'DAYS_EMPLOYED']
+   missing = [f for f in required if f not in applicants_df.columns]
+   if 'DAYS_EMPLOYED' not in applicants_df.columns and 'EMPLOYMENT_YEARS' not in applicants_df.columns:
+       missing.append('DAYS_EMPLOYED (ou EMPLOYMENT_YEARS)')
+   if missing:
+       return None, f"Colonnes manquantes : {', '.join(missing)}"
+
+   clients, row_errors = [], {}
+   for position, row in enumerate(applicants_df.to_dict('records')):
+       try:
+           client = {
+               feature: float(row[feature])
+               for feature in DASHBOARD_FEATURES
+               if feature not in ('DAYS_EMPLOYED', 'CODE_GENDER', 'NAME_EDUCATION_TYPE_Higher_education')
+           }
+           if 'EMPLOYMENT_YEARS' in row and pd.notna(row['EMPLOYMENT_YEARS']):
+               client['DAYS_EMPLOYED'] = employment_years_to_days(row['EMPLOYMENT_YEARS'])
+           else:
+               client['DAYS_EMPLOYED'] = int(row['DAYS_EMPLOYED'])
+           client['CODE_GENDER'] = normalize_gender(row['CODE_GENDER'])
+           client['NAME_EDUCATION_TYPE_Higher_education'] = normalize_education(row['NAME_EDUCATION_TYPE_Higher_education'])
+           if any(pd.isna(value) for value in client.values() if isinstance(value, float)):
+               raise ValueError("valeur manquante")
+           clients.append(client)
+       except (TypeError, ValueError) as e:
+           row_errors[position] = str(e)
+           clients.append(None)
+   return clients, row_errors
+
+def score_batch_chunk(chunk, engine):
+   """Scorer un paquet sur les valeurs exactes : un appel vectorisé local, sinon API sans cache"""
+   results = [(None, "Ligne invalide") if client is None else None for client in chunk]
+   valid = [i for i, client in enumerate(chunk) if client is not None]
+
+   if engine is not None and valid:
+       try:
+           probabilities = engine.predict_batch([chunk[i] for i in valid])
+           for i, probability in zip(valid, probabilities):
+               results[i] = engine.build_result(probability), None
+       except ValueError as e:
+           # Profils incomplets pour le moteur local : appels API
+           logger.info("Scoring local du paquet impossible, repli API : %s", e)
+
+   # Pas de cache LRU partagé (clé arrondie) ni de repli local silencieux : source explicite par ligne
+   pending = [i for i in valid if results[i] is None]
+   responses = run_concurrently(
+       [(call_prediction_api, (chunk[i],)) for i in pending],
+       max_concurrency=BATCH_MAX_WORKERS
+   )
+   for i, (result, error) in zip(pending, responses):
+       results[i] = ({**result, 'source': 'api'}, None) if result else (None, error)
+   return results
+
+def score_clients_in_chunks(clients):
+   """Scorer des clients par paquets selon le moteur choisi (générateur)"""
+   engine = batch_scoring_engine()
+   for start in range(0, len(clients), BATCH_CHUNK_SIZE):
+       yield start, score_batch_chunk(clients[start:start + BATCH_CHUNK_SIZE], engine)
+
 # Interface de saisie client
 
+@timed_stage('render:create_client_form')
 def create_client_form():
    """Formulaire de saisie client"""
    
@@ -362,45 +1871,50 @@ def create_client_form():
 
    with col1:
 
+       min_value, max_value, step = FEATURE_BOUNDS['EXT_SOURCE_2']
        ext_source_2 = st.slider(
            "Score Externe 2",
-           0.0, 1.0,
+           min_value, max_value,
            float(default_values.get('EXT_SOURCE_2', 0.6)),
-           0.01,
+           step,
            help=FEATURE_EXPLANATIONS["EXT_SOURCE_2"]
        )
 
+       min_value, max_value, step = FEATURE_BOUNDS['EXT_SOURCE_3']
        ext_source_3 = st.slider(
            "Score Externe 3",
-           0.0, 1.0,
+           min_value, max_value,
            float(default_values.get('EXT_SOURCE_3', 0.5)),
-           0.01,
+           step,
            help=FEATURE_EXPLANATIONS["EXT_SOURCE_3"]
        )
 
+       min_value, max_value, step = FEATURE_BOUNDS['EXT_SOURCE_1']
        ext_source_1 = st.slider(
            "Score Externe 1",
-           0.0, 1.0,
+           min_value, max_value,
            float(default_values.get('EXT_SOURCE_1', 0.4)),
-           0.01,
+           step,
            help=FEATURE_EXPLANATIONS["EXT_SOURCE_1"]
        )
 
        # Conversion jours en années pour l'affichage
        default_employment = abs(default_values.get('DAYS_EMPLOYED', -1825)) / 365.25
+       min_value, max_value, step = FEATURE_BOUNDS['DAYS_EMPLOYED']
        employment_years = st.number_input(
            "Ancienneté emploi (années)",
-           0.0, 40.0,
+           min_value, max_value,
            float(default_employment),
-           0.01,
+           step,
            help=FEATURE_EXPLANATIONS["DAYS_EMPLOYED"]
        )
 
+       min_value, max_value, step = FEATURE_BOUNDS['INSTAL_DPD_MEAN']
        instal_dpd_mean = st.slider(
            "Retards moyens (jours)",
-           0.0, 30.0,
+           min_value, max_value,
            float(default_values.get('INSTAL_DPD_MEAN', 0.5)),
-           0.1,
+           step,
            help=FEATURE_EXPLANATIONS["INSTAL_DPD_MEAN"]
        )
 
@@ -414,11 +1928,12 @@ def create_client_form():
            index=0 if default_gender == "Femme" else 1
        )
 
+       min_value, max_value, step = FEATURE_BOUNDS['PAYMENT_RATE']
        payment_rate = st.slider(
            "Ratio d'endettement",
-           0.0, 1.0,
+           min_value, max_value,
            float(default_values.get('PAYMENT_RATE', 0.15)),
-           0.01,
+           step,
            help=FEATURE_EXPLANATIONS["PAYMENT_RATE"]
        )
 
@@ -430,31 +1945,33 @@ def create_client_form():
            index=0 if default_education == "Non" else 1
        )
 
+       min_value, max_value, step = FEATURE_BOUNDS['AMT_ANNUITY']
        annuity = st.number_input(
            "Annuité mensuelle (€)",
-           5000, 100000,
+           min_value, max_value,
            int(default_values.get('AMT_ANNUITY', 18000)),
-           1000,
+           step,
            help=FEATURE_EXPLANATIONS["AMT_ANNUITY"]
        )
 
+       min_value, max_value, step = FEATURE_BOUNDS['INSTAL_AMT_PAYMENT_SUM']
        payment_sum = st.number_input(
            "Historique paiements (€)",
-           10000, 1000000,
+           min_value, max_value,
            int(default_values.get('INSTAL_AMT_PAYMENT_SUM', 120000)),
-           10000,
+           step,
            help="Somme des paiements antérieurs"
        )
 
    # Conversion pour API (années vers jours négatifs)
-   employment_days = -int(employment_years * 365.25)
+   employment_days = employment_years_to_days(employment_years)
 
    client_data = {
        "EXT_SOURCE_2": float(ext_source_2),
        "EXT_SOURCE_3": float(ext_source_3),
        "EXT_SOURCE_1": float(ext_source_1),
        "DAYS_EMPLOYED": employment_days,
-       "CODE_GENDER": "M" if gender == "Homme" else "F",
+       "CODE_GENDER": normalize_gender(gender),
        "INSTAL_DPD_MEAN": float(instal_dpd_mean),
        "PAYMENT_RATE": float(payment_rate),
        "NAME_EDUCATION_TYPE_Higher_education": 1 if education == "Oui" else 0,
@@ -466,36 +1983,23 @@ def create_client_form():
 
 # Affichage des résultats
 
-def display_prediction_result(result):
-   """Afficher résultat de prédiction avec jauge modernisée"""
-   prediction = result.get('prediction', {})
-   probability = prediction.get('probability', 0)
-   decision = prediction.get('decision', 'UNKNOWN')
-   decision_fr = prediction.get('decision_fr', decision)
-   risk_level = prediction.get('risk_level', 'Inconnu')
-   
-   # Récupération du Thresold depuis l'API
-   threshold = prediction.get('threshold', 0.1)
-   threshold_percent = threshold * 100
+GAUGE_LAYOUT = {
+   'height': 450,
+   'font': {'color': "#1e40af", 'family': "Arial", 'size': 16},
+   'margin': dict(l=50, r=50, t=80, b=50),
+   'paper_bgcolor': 'rgba(0,0,0,0)',
+   'plot_bgcolor': 'rgba(0,0,0,0)'
+}
 
-   # Résultat principal
-   if decision == "REFUSE":
-       st.markdown(f"""
-       <div class="metric-card error-card refused">
-           <h2>❌ CRÉDIT REFUSÉ - <strong>Probabilité de défaut: {probability:.1%}</strong> Niveau de risque: {risk_level}</h2>
-       </div>
-       """, unsafe_allow_html=True)
-   else:
-       st.markdown(f"""
-       <div class="metric-card success-card approved">
-           <h2>✅ CRÉDIT ACCORDÉ - <strong>Probabilité de défaut: {probability:.1%}</strong> Niveau de risque: {risk_level}</h2>
-       </div>
-       """, unsafe_allow_html=True)
+@st.cache_resource(show_spinner=False, max_entries=GAUGE_TEMPLATE_CACHE_SIZE)
+@timed_stage('figure:gauge_template')
+def load_gauge_template(threshold):
+   """Jauge sans valeur, zones calées sur le seuil de décision (construite une fois par seuil)"""
+   threshold_percent = threshold * 100
 
-   # Jauge avec seuil dynamique
    fig_gauge = go.Figure(go.Indicator(
        mode="gauge+number",
-       value=probability * 100,
+       value=0,
        domain={'x': [0, 1], 'y': [0, 1]},
        title={
            'text': "📊 Niveau de Risque (%)",
@@ -534,15 +2038,48 @@ def display_prediction_result(result):
        }
    ))
 
-   fig_gauge.update_layout(
-       height=450,
-       font={'color': "#1e40af", 'family': "Arial", 'size': 16},
-       margin=dict(l=50, r=50, t=80, b=50),
-       paper_bgcolor='rgba(0,0,0,0)',
-       plot_bgcolor='rgba(0,0,0,0)'
-   )
+   fig_gauge.update_layout(**GAUGE_LAYOUT)
+
+   return fig_gauge
+
+@timed_stage('figure:create_gauge_figure')
+def create_gauge_figure(probability, threshold):
+   """Jauge de risque d'un client : copie du gabarit partagé, valeur appliquée sur la copie"""
+   fig_gauge = go.Figure(load_gauge_template(threshold))
+   fig_gauge.update_traces(value=probability * 100)
+   return fig_gauge
+
+@timed_stage('render:display_prediction_result')
+def display_prediction_result(result):
+   """Afficher résultat de prédiction avec jauge modernisée"""
+   prediction = result.get('prediction', {})
+   probability = prediction.get('probability', 0)
+   decision = prediction.get('decision', 'UNKNOWN')
+   decision_fr = prediction.get('decision_fr', decision)
+   risk_level = prediction.get('risk_level', 'Inconnu')
+   
+   # Récupération du Thresold depuis l'API
+   threshold = prediction.get('threshold', 0.1)
+   threshold_percent = threshold * 100
+
+   # Résultat principal
+   if decision == "REFUSE":
+       st.markdown(f"""
+       <div class="metric-card error-card refused">
+           <h2>❌ CRÉDIT REFUSÉ - <strong>Probabilité de défaut: {probability:.1%}</strong> Niveau de risque: {risk_level}</h2>
+       </div>
+       """, unsafe_allow_html=True)
+   else:
+       st.markdown(f"""
+       <div class="metric-card success-card approved">
+           <h2>✅ CRÉDIT ACCORDÉ - <strong>Probabilité de défaut: {probability:.1%}</strong> Niveau de risque: {risk_level}</h2>
+       </div>
+       """, unsafe_allow_html=True)
+
+   # Jauge avec seuil dynamique
+   fig_gauge = create_gauge_figure(probability, threshold)
 
-   st.plotly_chart(fig_gauge, use_container_width=True, config=PLOTLY_CONFIG)
+   show_plotly_chart(fig_gauge, use_container_width=True, config=PLOTLY_CONFIG)
 
    # Affichage probalbilité, seuil et écart au seuil
    probability_percent = probability * 100
@@ -587,7 +2124,7 @@ def display_prediction_result(result):
    if abs(ecart_avec_seuil) < 1:  # Très proche du seuil
        st.warning(f"""
        ⚠️ **Client proche du seuil** : Écart de seulement {abs(ecart_avec_seuil):.2f} points
-       → Décision sensible aux variations des données
+       → Décision sensible aux variations des données (voir l'analyse de sensibilité, onglet Simulations)
        """)
    elif ecart_avec_seuil < -5:  # Bien en dessous
        st.success(f"""
@@ -607,12 +2144,21 @@ def display_prediction_result(result):
    Écart avec le seuil : {ecart_avec_seuil:+.2f} points.
    """)
 
+@timed_stage('render:display_feature_importance')
 def display_feature_importance(result):
    """Afficher importance des variables avec graphique et tableau détaillé"""
    explanation = result.get('explanation', {})
    top_features = explanation.get('top_features', [])
    client_data = st.session_state.client_data
 
+   # Contributions exactes des 10 variables si le modèle local a produit le score ou est celui de l'API
+   local_contributions = explain_client(client_data) if can_explain_locally(result) else None
+   if local_contributions is not None:
+       top_features = [
+           {'feature': feature, 'shap_value': shap_value}
+           for feature, shap_value in local_contributions.items()
+       ]
+
    if not top_features:
        st.warning("Explications des variables non disponibles")
        return
@@ -622,7 +2168,7 @@ def display_feature_importance(result):
    # Créer données complètes pour toutes les variables
    all_features_data = []
 
-   # Variables avec impact SHAP (top 5)
+   # Variables expliquées (10 en local, top 5 renvoyé par l'API sinon)
    for feature in top_features:
        feature_name = feature.get('feature', '')
        shap_value = feature.get('shap_value', 0)
@@ -644,22 +2190,10 @@ def display_feature_importance(result):
            'impact': impact
        })
 
-   # Ajouter les variables restantes avec valeur SHAP = 0
-   remaining_features = [
-       'EXT_SOURCE_1', 'EXT_SOURCE_2', 'DAYS_EMPLOYED',
-       'NAME_EDUCATION_TYPE_Higher_education', 'INSTAL_AMT_PAYMENT_SUM'
-   ]
-
-   for feature_name in remaining_features:
-       if not any(f['feature'] == feature_name for f in all_features_data):
-           client_value = client_data.get(feature_name, 0)
-           all_features_data.append({
-               'feature': feature_name,
-               'feature_fr': FEATURE_TRANSLATIONS.get(feature_name, feature_name),
-               'shap_value': 0.0,
-               'client_value': client_value,
-               'impact': "Impact neutre"
-           })
+   # Aucune contribution inventée pour les variables absentes de la réponse API
+   if len(all_features_data) < len(DASHBOARD_FEATURES):
+       st.caption(f"ℹ️ Explications de l'API limitées aux {len(all_features_data)} variables les plus influentes ; "
+                  "les autres variables ne sont pas affichées.")
 
    # Créer DataFrame pour le graphique
    features_df = pd.DataFrame(all_features_data)
@@ -673,7 +2207,8 @@ def display_feature_importance(result):
        lambda x: "Augmente le risque" if x > 0 else ("Diminue le risque" if x < 0 else "Impact neutre")
    )
 
-   # Graphique horizontal
+   # Graphique horizontal (plotly.express importé au premier graphique)
+   import plotly.express as px
    fig = px.bar(
        features_df,
        x='shap_value',
@@ -698,7 +2233,7 @@ def display_feature_importance(result):
 
    fig.add_vline(x=0, line_dash="dash", line_color="gray", line_width=2)
 
-   st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+   show_plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
 
    # WCAG 1.1.1 : Texte alternatif pour graphique feature importance
    positive_features = [f['feature_fr'] for f in all_features_data if f['shap_value'] > 0]
@@ -766,6 +2301,7 @@ def display_feature_importance(result):
    </div>
    """, unsafe_allow_html=True)
 
+@timed_stage('render:display_client_profile')
 def display_client_profile(client_data):
    """Afficher profil client complet"""
    st.markdown("### 👤 Profil du client")
@@ -807,26 +2343,42 @@ def display_client_profile(client_data):
        # WCAG 1.1.1 : Description textuelle des métriques
        st.caption("Annuité : montant mensuel du crédit. Education supérieure : Oui ou Non. Historique : cumul des paiements antérieurs.")
 
+@timed_stage('render:create_simple_population_plot')
 def create_simple_population_plot(distribution_data, client_value, variable_name):
    """Créer histogramme simple : distribution population + ligne client"""
 
-   values = distribution_data.get('values', [])
+   # Barres pré-calculées si disponibles, sinon calcul depuis les valeurs brutes
+   histogram = distribution_data.get('histogram')
+   if histogram is None:
+       values = convert_categorical_values(distribution_data.get('values', []), variable_name)
+       if variable_name in CATEGORICAL_FEATURES:
+           values = values[~np.isnan(values)]  # valeurs manquantes exclues des barres
+       histogram = compute_histogram(values, variable_name) if len(values) > 0 else None
 
-   if not values:
+   if histogram is None or histogram['counts'].sum() == 0:
        st.error(f"Aucune donnée disponible pour {variable_name}")
        return
 
    # Conversion avec fonction centralisée
    client_value_numeric = convert_client_value(client_value, variable_name)
-   values = convert_categorical_values(values, variable_name)
+
+   # Percentile client via l'index trié (sans reparcourir la population)
+   client_percentile = None
+   if variable_name not in CATEGORICAL_FEATURES:
+       percentile_index = get_percentile_index()
+       if percentile_index is not None:
+           client_percentile = percentile_index.percentile(variable_name, client_value_numeric)
 
    # Histogramme simple
    fig = go.Figure()
 
-   # Histogramme population
-   fig.add_trace(go.Histogram(
-       x=values,
-       nbinsx=30 if variable_name not in ['CODE_GENDER', 'NAME_EDUCATION_TYPE_Higher_education'] else 10,
+   # Histogramme population : seules les ~30 barres sont envoyées au navigateur
+   fig.add_trace(go.Bar(
+       x=histogram['centers'],
+       y=histogram['counts'],
+       width=histogram['widths'],
+       customdata=np.column_stack([histogram['lower'], histogram['upper']]),
+       hovertemplate="[%{customdata[0]:.4g} ; %{customdata[1]:.4g}] : %{y} clients<extra></extra>",
        opacity=0.7,
        marker_color='lightblue',
        name='Population',
@@ -840,7 +2392,7 @@ def create_simple_population_plot(distribution_data, client_value, variable_name
            line_dash="solid",
            line_color="red",
            line_width=4,
-           annotation_text="📍 Client",
+           annotation_text="📍 Client" if client_percentile is None else f"📍 Client ({client_percentile:.0f}e percentile)",
            annotation_position="top"
        )
    except (TypeError, ValueError):
@@ -875,7 +2427,7 @@ def create_simple_population_plot(distribution_data, client_value, variable_name
 
    fig.update_layout(layout_config)
 
-   st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+   show_plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
 
    # WCAG 1.1.1 : Texte alternatif pour histogramme population
    variable_fr = FEATURE_TRANSLATIONS.get(variable_name, variable_name)
@@ -892,10 +2444,13 @@ def create_simple_population_plot(distribution_data, client_value, variable_name
        **Description graphique :** Histogramme de distribution de la variable {variable_fr} dans la population.
        L'axe horizontal représente les valeurs de {variable_fr}, l'axe vertical le nombre de clients.
        Le client analysé (valeur: {client_val_formatted}) est positionné par une ligne rouge verticale.
+       {f"Il se situe au {client_percentile:.0f}e percentile de la population." if client_percentile is not None else ""}
        """)
 
+@st.fragment
+@timed_rerun('comparaison')
 def display_simple_population_comparison(client_data):
-   """Interface comparaison population - AVEC CONTRÔLE API"""
+   """Interface comparaison population - AVEC CONTRÔLE API (fragment : seul ce panneau est ré-exécuté)"""
 
    # Layout avec bouton
    col1, col2 = st.columns([3, 1])
@@ -909,53 +2464,79 @@ def display_simple_population_comparison(client_data):
        )
 
    with col2:
-       # Bouton avec appel API
-       if st.button("📊 Charger données", help="Charger les données de cette variable", key="load_population_btn"):
+       # Bouton avec appel API groupé (toutes les variables en une fois)
+       if st.button("📊 Charger données", help="Charger les données population de toutes les variables", key="load_population_btn"):
            
            with st.spinner("🔄 Chargement des données population..."):
-               # Appel API
-               distribution_data = get_population_distribution(selected_variable)
+               store, errors = get_population_store()
            
-           if distribution_data:
-               client_value = client_data.get(selected_variable)
-               
-               if client_value is not None:
-                   # Stocker dans session state pour éviter re-appel
-                   st.session_state[f'population_data_{selected_variable}'] = distribution_data
-                   st.success(f"✅ Données chargées pour {FEATURE_TRANSLATIONS.get(selected_variable, selected_variable)}")
-                   
-                   # Afficher le graphique
-                   create_simple_population_plot(distribution_data, client_value, selected_variable)
-               else:
-                   st.error(f"Valeur client manquante pour {selected_variable}")
+           if store is not None:
+               st.session_state.population_loaded = True
+               if errors:
+                   st.warning(f"Variables indisponibles : {', '.join(errors)}")
            else:
-               st.error(f"Impossible de charger les données pour {selected_variable}")
+               st.error("Impossible de charger les données population")
    
-   # Afficher données en cache si disponibles
-   cache_key = f'population_data_{selected_variable}'
-   if cache_key in st.session_state:
-       st.info("📋 Données en cache - Cliquez sur 'Charger données' pour actualiser")
+   # Données partagées : changer de variable ne coûte aucun appel réseau
+   if st.session_state.population_loaded:
+       store, _ = get_population_store()
+       if store is None or selected_variable not in store:
+           st.error(f"Impossible de charger les données pour {selected_variable}")
+           return
+
+       st.info("📋 Données population en mémoire - changement de variable instantané")
+       display_staleness(get_population_cache(), "Données population périmées")
        client_value = client_data.get(selected_variable)
        if client_value is not None:
-           create_simple_population_plot(st.session_state[cache_key], client_value, selected_variable)
+           # Histogramme pré-calculé depuis le store partagé, aucune copie en session
+           distribution_data = {'histogram': get_population_histogram(selected_variable)}
+           create_simple_population_plot(distribution_data, client_value, selected_variable)
+       else:
+           st.error(f"Valeur client manquante pour {selected_variable}")
 
+@timed_stage('render:display_bivariate_analysis')
 def display_bivariate_analysis(cached_data, var1, var2, client_data):
    """Afficher analyse bi-variée depuis les données (cache ou fraîches)"""
    x_data = cached_data['x_data']
    y_data = cached_data['y_data']
-   
-   # Graphique de corrélation
-   fig = px.scatter(
-       x=x_data,
-       y=y_data,
-       title=f"Relation entre {FEATURE_TRANSLATIONS.get(var1, var1)} et {FEATURE_TRANSLATIONS.get(var2, var2)}",
-       labels={
-           'x': FEATURE_TRANSLATIONS.get(var1, var1),
-           'y': FEATURE_TRANSLATIONS.get(var2, var2)
-       },
-       opacity=0.6,
-       color_discrete_sequence=['lightblue']
-   )
+   title = f"Relation entre {FEATURE_TRANSLATIONS.get(var1, var1)} et {FEATURE_TRANSLATIONS.get(var2, var2)}"
+
+   # Mode agrégé au-delà du seuil : une cellule par zone au lieu d'un marqueur par client
+   density_mode = len(x_data) > BIVARIATE_DENSITY_THRESHOLD
+
+   if density_mode:
+       density = get_bivariate_density(var1, var2)
+       if density is None:
+           density = compute_density_grid(x_data, y_data, var1, var2)
+
+       fig = go.Figure(go.Heatmap(
+           x=density['x_centers'],
+           y=density['y_centers'],
+           z=density['counts'],
+           colorscale='Blues',
+           colorbar={'title': 'Clients'},
+           hovertemplate="x=%{x:.4g}<br>y=%{y:.4g}<br>%{z:.0f} clients<extra></extra>"
+       ))
+       fig.update_layout(
+           title=title,
+           xaxis_title=FEATURE_TRANSLATIONS.get(var1, var1),
+           yaxis_title=FEATURE_TRANSLATIONS.get(var2, var2),
+           plot_bgcolor='white'
+       )
+   else:
+       # Graphique de corrélation
+       import plotly.express as px
+       fig = px.scatter(
+           x=x_data,
+           y=y_data,
+           title=title,
+           labels={
+               'x': FEATURE_TRANSLATIONS.get(var1, var1),
+               'y': FEATURE_TRANSLATIONS.get(var2, var2)
+           },
+           opacity=0.6,
+           color_discrete_sequence=['lightblue']
+       )
 
    # Position du client avec conversions
    client_x = client_data.get(var1, 0)
@@ -991,48 +2572,968 @@ def display_bivariate_analysis(cached_data, var1, var2, client_data):
    )
 
    fig.update_layout(height=500, showlegend=False)
-   st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+   show_plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
 
-   # Analyses et textes
-   correlation = np.corrcoef(x_data, y_data)[0, 1] if len(x_data) > 1 else 0
+   # Analyses et textes (corrélations pré-calculées pour la paire)
+   correlation_summary = get_correlation_summary()
+   pair_stats = correlation_summary.pair_stats(var1, var2) if correlation_summary else None
+   if pair_stats is None:
+       pair_stats = {'pearson': pearson_correlation(x_data, y_data), 'spearman': np.nan, 'n': len(x_data)}
    var1_fr = FEATURE_TRANSLATIONS.get(var1, var1)
    var2_fr = FEATURE_TRANSLATIONS.get(var2, var2)
 
+   if density_mode:
+       population_text = (f"Carte de densité montrant la relation entre {var1_fr} (axe horizontal) et {var2_fr} (axe vertical) "
+                          f"pour {len(x_data):,} clients. Plus une cellule est foncée, plus elle regroupe de clients de la population.")
+   else:
+       population_text = (f"Nuage de points montrant la relation entre {var1_fr} (axe horizontal) et {var2_fr} (axe vertical). "
+                          "Chaque point bleu représente un client de la population.")
+
    st.markdown(f"""
-   **Description graphique :** Nuage de points montrant la relation entre {var1_fr} (axe horizontal) et {var2_fr} (axe vertical).
-   Chaque point bleu représente un client de la population. Les lignes rouges en pointillés indiquent la position du client analysé : 
+   **Description graphique :** {population_text}
+   Les lignes rouges en pointillés indiquent la position du client analysé : 
    ligne verticale à {var1_fr} = {client_x}, ligne horizontale à {var2_fr} = {client_y}.
    Le croisement des deux lignes localise le client dans la distribution.
    """)
 
-   # Analyse positionnement client
-   percentile_x = sum(1 for val in x_data if val <= client_x) / len(x_data) * 100
-   percentile_y = sum(1 for val in y_data if val <= client_y) / len(y_data) * 100
+   # Analyse positionnement client (recherche dichotomique sur colonnes triées)
+   percentile_index = get_percentile_index()
+   percentile_x = percentile_index.percentile(var1, client_x) if percentile_index else None
+   percentile_y = percentile_index.percentile(var2, client_y) if percentile_index else None
+   if percentile_x is None:
+       percentile_x = np.count_nonzero(np.asarray(x_data) <= client_x) / len(x_data) * 100
+   if percentile_y is None:
+       percentile_y = np.count_nonzero(np.asarray(y_data) <= client_y) / len(y_data) * 100
    
    st.info(f"""
    📍 **Position du client dans la population :**
    • {var1_fr} : {percentile_x:.0f}e percentile (ligne verticale rouge)
    • {var2_fr} : {percentile_y:.0f}e percentile (ligne horizontale rouge)
    • **Croisement** : intersection des deux lignes = position exacte du client
+   • **Corrélation** : Pearson r = {pair_stats['pearson']:.2f}, Spearman ρ = {pair_stats['spearman']:.2f} (n = {pair_stats['n']:,} clients)
    """)
 
    st.success(f"✅ Analyse terminée")
 
+# Simulation what-if
+
+@st.cache_resource
+def get_simulation_executor():
+   """Pool de threads partagé pour les re-scorings de simulation"""
+   return ThreadPoolExecutor(max_workers=SIMULATION_WORKERS, thread_name_prefix="simulation")
+
+def reset_simulation_state():
+   """Oublier curseurs et scénarios de simulation (nouveau client)"""
+   for key in [key for key in st.session_state.keys() if key.startswith('sim_')]:
+       del st.session_state[key]
+   st.session_state.simulation_results = {}
+   st.session_state.simulation_pending = None
+
+@timed_stage('render:create_simulation_inputs')
+def create_simulation_inputs(client_data):
+   """Curseurs de simulation initialisés sur le profil analysé"""
+   simulated = dict(client_data)
+   col1, col2 = st.columns(2)
+
+   continuous_features = [feature for feature in DASHBOARD_FEATURES if feature in FEATURE_BOUNDS]
+   for i, feature in enumerate(continuous_features):
+       min_value, max_value, step = FEATURE_BOUNDS[feature]
+       value_type = type(min_value)
+       with col1 if i % 2 == 0 else col2:
+           if feature == 'DAYS_EMPLOYED':
+               # Saisie en années comme dans le formulaire
+               default = abs(client_data.get(feature, 0)) / 365.25
+               years = st.slider(
+                   "Ancienneté emploi (années)",
+                   min_value, max_value,
+                   float(np.clip(default, min_value, max_value)),
+                   step,
+                   key=f"sim_{feature}"
+               )
+               simulated[feature] = employment_years_to_days(years)
+           else:
+               default = value_type(np.clip(client_data.get(feature, min_value), min_value, max_value))
+               value = st.slider(
+                   FEATURE_TRANSLATIONS.get(feature, feature),
+                   min_value, max_value,
+                   default,
+                   step,
+                   key=f"sim_{feature}",
+                   help=FEATURE_EXPLANATIONS.get(feature)
+               )
+               simulated[feature] = float(value)
+
+   with col1:
+       gender = st.selectbox(
+           "Genre",
+           ["Femme", "Homme"],
+           index=1 if client_data.get('CODE_GENDER') == 'M' else 0,
+           key="sim_CODE_GENDER"
+       )
+       simulated['CODE_GENDER'] = normalize_gender(gender)
+
+   with col2:
+       education = st.selectbox(
+           "Éducation supérieure",
+           ["Non", "Oui"],
+           index=1 if client_data.get('NAME_EDUCATION_TYPE_Higher_education', 0) == 1 else 0,
+           key="sim_NAME_EDUCATION_TYPE_Higher_education"
+       )
+       simulated['NAME_EDUCATION_TYPE_Higher_education'] = normalize_education(education)
+
+   return simulated
+
+def score_simulation(simulated):
+   """Re-scoring d'un scénario : scénarios déjà vus, debounce puis appel annulable"""
+   mode = st.session_state.get('scoring_mode')
+   engine, _ = load_local_engine()
+   if engine is not None and mode == 'local':
+       # Moteur local instantané : ni debounce ni annulation nécessaires
+       result, error = engine.predict(simulated)
+       if result is not None:
+           return result, None
+       # Profil incomplet pour le moteur local : repli sur l'API
+
+   key = canonical_client_key(simulated)
+   seen = st.session_state.simulation_results
+   if key in seen:
+       return seen[key], None
+
+   # Requête précédente devenue obsolète : annulée si pas encore démarrée
+   pending = st.session_state.simulation_pending
+   if pending is not None and pending[0] != key:
+       pending[1].cancel()
+
+   # Debounce : si le curseur bouge encore, Streamlit interrompt ce rerun au prochain affichage
+   status = st.empty()
+   status.caption("⏳ Scénario en attente...")
+   time.sleep(SIMULATION_DEBOUNCE)
+   # Point d'interruption après le debounce : une valeur dépassée n'est jamais soumise
+   status.caption("🔄 Re-scoring en cours...")
+
+   future = get_simulation_executor().submit(bind_script_run_ctx(score_client), simulated, mode)
+   st.session_state.simulation_pending = (key, future)
+   start = time.perf_counter()
+   shown = None
+   while not future.done():
+       # Texte mis à jour toutes les 0.5 s seulement : chaque changement est un point d'interruption
+       text = f"🔄 Re-scoring en cours... ({int((time.perf_counter() - start) * 2) / 2:.1f} s)"
+       if text != shown:
+           status.caption(text)
+           shown = text
+       time.sleep(0.05)
+   status.empty()
+   st.session_state.simulation_pending = None
+
+   result, error = future.result()
+   if result:
+       seen[key] = result
+       if len(seen) > SIMULATION_HISTORY_SIZE:
+           seen.pop(next(iter(seen)))
+   return result, error
+
+@st.fragment
+@timed_rerun('simulation')
+def display_simulation_panel(client_data, base_result):
+   """Simulation what-if : re-scoring immédiat, seul ce panneau est ré-exécuté"""
+   base_prediction = base_result.get('prediction', {})
+   base_probability = base_prediction.get('probability', 0)
+
+   col1, col2 = st.columns([3, 1])
+   with col1:
+       st.caption("Déplacez un curseur : le client est re-scoré aussitôt, sans recharger la page.")
+   with col2:
+       if st.button("↩️ Profil initial", help="Revenir aux valeurs du client analysé", key="reset_simulation_btn"):
+           reset_simulation_state()
+           st.rerun(scope="fragment")
+
+   simulated = create_simulation_inputs(client_data)
+   result, error = score_simulation(simulated)
+
+   if not result:
+       st.error(f"❌ Erreur de simulation : {error}")
+       return
+
+   prediction = result.get('prediction', {})
+   probability = prediction.get('probability', 0)
+   threshold = prediction.get('threshold', 0.1)
+   decision = prediction.get('decision', 'UNKNOWN')
+
+   # Jauge mise à jour en place (clé stable)
+   show_plotly_chart(create_gauge_figure(probability, threshold), use_container_width=True,
+                   config=PLOTLY_CONFIG, key="simulation_gauge")
+
+   col1, col2 = st.columns(2)
+   with col1:
+       st.metric(
+           label="📊 Probabilité simulée",
+           value=f"{probability * 100:.2f}%",
+           delta=f"{(probability - base_probability) * 100:+.2f} points",
+           delta_color="inverse",
+           help="Écart avec la probabilité du profil analysé"
+       )
+   with col2:
+       st.metric(
+           label="🎯 Décision simulée",
+           value="❌ Refusé" if decision == "REFUSE" else "✅ Accordé"
+       )
+
+   changed = [
+       FEATURE_TRANSLATIONS.get(feature, feature)
+       for (feature, value), (_, base_value) in zip(canonical_client_key(simulated), canonical_client_key(client_data))
+       if value != base_value
+   ]
+
+   # WCAG 1.1.1 : Texte alternatif pour la jauge simulée
+   st.markdown(f"""
+   **Description graphique :** Jauge de risque du scénario simulé : {probability:.1%} de probabilité de défaut
+   (profil analysé : {base_probability:.1%}, seuil : {threshold:.1%}).
+   Variables modifiées : {', '.join(changed) if changed else 'aucune'}.
+   """)
+
+# Analyse de sensibilité
+
+def sensitivity_grid(feature, points):
+   """Valeurs candidates entre les bornes du formulaire : (valeurs affichées, valeurs API)"""
+   min_value, max_value, _ = FEATURE_BOUNDS[feature]
+   display_values = np.linspace(min_value, max_value, points)
+   if feature == 'DAYS_EMPLOYED':
+       # Années affichées, jours négatifs envoyés au modèle
+       return display_values, -(display_values * 365.25).astype(int)
+   return display_values, display_values
+
+def client_display_value(client_data, feature):
+   """Valeur client dans l'unité des curseurs (années pour l'ancienneté)"""
+   value = client_data.get(feature, 0)
+   return abs(value) / 365.25 if feature == 'DAYS_EMPLOYED' else value
+
+def threshold_crossings(display_values, probabilities, threshold):
+   """Valeurs où la probabilité franchit le seuil (interpolation linéaire)"""
+   gaps = probabilities - threshold
+   crossings = []
+   for i in np.flatnonzero(np.sign(gaps[:-1]) * np.sign(gaps[1:]) < 0):
+       ratio = gaps[i] / (gaps[i] - gaps[i + 1])
+       crossings.append(display_values[i] + ratio * (display_values[i + 1] - display_values[i]))
+   return crossings
+
+def run_sensitivity_sweep(client_data, feature1, feature2=None):
+   """Scorer toute la grille (1 ou 2 variables) en un seul lot ; grille réduite via l'API"""
+   if batch_scoring_engine() is not None:
+       points_1d, points_2d = SENSITIVITY_POINTS_1D, SENSITIVITY_POINTS_2D
+   else:
+       # Un appel API par point : grille plus grossière
+       points_1d, points_2d = SENSITIVITY_POINTS_1D_API, SENSITIVITY_POINTS_2D_API
+
+   if feature2 is None:
+       display_x, api_x = sensitivity_grid(feature1, points_1d)
+       clients = [{**client_data, feature1: value.item()} for value in api_x]
+       probabilities, threshold, source = score_clients_batch(clients, use_cache=False)
+       return {'x': display_x, 'probabilities': probabilities, 'threshold': threshold, 'source': source}
+
+   display_x, api_x = sensitivity_grid(feature1, points_2d)
+   display_y, api_y = sensitivity_grid(feature2, points_2d)
+   grid_x, grid_y = np.meshgrid(api_x, api_y)
+   clients = [
+       {**client_data, feature1: x.item(), feature2: y.item()}
+       for x, y in zip(grid_x.ravel(), grid_y.ravel())
+   ]
+   probabilities, threshold, source = score_clients_batch(clients, use_cache=False)
+   return {
+       'x': display_x,
+       'y': display_y,
+       'probabilities': probabilities.reshape(grid_x.shape),
+       'threshold': threshold,
+       'source': source
+   }
+
+@timed_stage('render:display_sensitivity_analysis')
+def display_sensitivity_analysis(client_data):
+   """Courbe (1 variable) ou carte (2 variables) de la probabilité face au seuil"""
+   features = [feature for feature in DASHBOARD_FEATURES if feature in FEATURE_BOUNDS]
+
+   col1, col2, col3 = st.columns([2, 2, 1])
+   with col1:
+       feature1 = st.selectbox(
+           "Variable étudiée",
+           features,
+           format_func=lambda x: FEATURE_TRANSLATIONS.get(x, x),
+           key="sensitivity_feature1"
+       )
+   with col2:
+       feature2 = st.selectbox(
+           "Seconde variable (optionnelle)",
+           [None] + [feature for feature in features if feature != feature1],
+           format_func=lambda x: "Aucune" if x is None else FEATURE_TRANSLATIONS.get(x, x),
+           key="sensitivity_feature2"
+       )
+   with col3:
+       run_sweep = st.button("📈 Calculer", use_container_width=True, key="sensitivity_btn")
+
+   params = (canonical_client_key(client_data), feature1, feature2)
+   if run_sweep:
+       with st.spinner("🔄 Scoring de la grille..."):
+           st.session_state.sensitivity_result = (params, run_sensitivity_sweep(client_data, feature1, feature2))
+
+   stored = st.session_state.get('sensitivity_result')
+   if stored is None or stored[0] != params:
+       return
+   sweep = stored[1]
+   threshold = sweep['threshold']
+   if threshold is None or np.isnan(sweep['probabilities']).all():
+       st.error("Impossible de scorer la grille")
+       return
+
+   feature1_fr = FEATURE_TRANSLATIONS.get(feature1, feature1)
+   unit1 = " (années)" if feature1 == 'DAYS_EMPLOYED' else ""
+   client_x = client_display_value(client_data, feature1)
+
+   if feature2 is None:
+       fig = go.Figure(go.Scatter(
+           x=sweep['x'],
+           y=sweep['probabilities'] * 100,
+           mode='lines+markers',
+           line={'color': '#3b82f6', 'width': 3},
+           name='Probabilité de défaut'
+       ))
+       fig.add_hline(y=threshold * 100, line_dash="dash", line_color="#dc2626", line_width=3,
+                     annotation_text="Seuil", annotation_position="right")
+       fig.add_vline(x=client_x, line_color="red", line_width=3,
+                     annotation_text="📍 Client", annotation_position="top")
+       fig.update_layout(
+           height=450,
+           title=f"Probabilité de défaut selon {feature1_fr}",
+           xaxis_title=f"{feature1_fr}{unit1}",
+           yaxis_title="Probabilité de défaut (%)",
+           showlegend=False
+       )
+       show_plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+
+       crossings = threshold_crossings(sweep['x'], sweep['probabilities'], threshold)
+       crossings_text = ', '.join(f"{value:.4g}" for value in crossings) if crossings else "aucune valeur dans les bornes du formulaire"
+       # WCAG 1.1.1 : Texte alternatif pour la courbe de sensibilité
+       st.markdown(f"""
+       **Description graphique :** Courbe de la probabilité de défaut lorsque {feature1_fr} varie de
+       {sweep['x'][0]:.4g} à {sweep['x'][-1]:.4g}, les autres variables restant fixes.
+       La ligne rouge en pointillés marque le seuil ({threshold:.1%}), la ligne verticale la valeur du client ({client_x:.4g}).
+       La décision bascule pour {feature1_fr} = {crossings_text}.
+       """)
+   else:
+       feature2_fr = FEATURE_TRANSLATIONS.get(feature2, feature2)
+       unit2 = " (années)" if feature2 == 'DAYS_EMPLOYED' else ""
+       fig = go.Figure(go.Contour(
+           x=sweep['x'],
+           y=sweep['y'],
+           z=sweep['probabilities'] * 100,
+           colorscale='RdYlGn_r',
+           colorbar={'title': '%'},
+           contours={'showlabels': True}
+       ))
+       # Frontière de décision
+       fig.add_trace(go.Contour(
+           x=sweep['x'],
+           y=sweep['y'],
+           z=sweep['probabilities'] * 100,
+           contours={'start': threshold * 100, 'end': threshold * 100, 'size': 1, 'coloring': 'lines'},
+           line={'color': 'black', 'width': 4, 'dash': 'dash'},
+           showscale=False,
+           hoverinfo='skip'
+       ))
+       fig.add_trace(go.Scatter(
+           x=[client_x],
+           y=[client_display_value(client_data, feature2)],
+           mode='markers+text',
+           marker={'color': 'red', 'size': 14, 'symbol': 'x'},
+           text=["📍 Client"],
+           textposition="top center"
+       ))
+       fig.update_layout(
+           height=550,
+           title=f"Probabilité de défaut selon {feature1_fr} et {feature2_fr}",
+           xaxis_title=f"{feature1_fr}{unit1}",
+           yaxis_title=f"{feature2_fr}{unit2}",
+           showlegend=False
+       )
+       show_plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+
+       # Combinaisons non scorées (NaN) exclues : ni accord ni refus
+       scored = sweep['probabilities'][~np.isnan(sweep['probabilities'])]
+       accepted_share = np.mean(scored < threshold)
+       # WCAG 1.1.1 : Texte alternatif pour la carte de sensibilité
+       st.markdown(f"""
+       **Description graphique :** Carte de la probabilité de défaut pour {feature1_fr} (axe horizontal) et {feature2_fr} (axe vertical),
+       du vert (risque faible) au rouge (risque élevé). La ligne noire en pointillés est la frontière de décision ({threshold:.1%}),
+       la croix rouge la position du client. {accepted_share:.0%} des combinaisons scorées conduisent à un accord.
+       """)
+
+   source_text = "moteur local (un appel vectorisé)" if sweep['source'] == 'local' else "API (appels concurrents, grille réduite)"
+   scored_count = np.count_nonzero(~np.isnan(sweep['probabilities']))
+   st.caption(f"{scored_count}/{sweep['probabilities'].size} scénarios scorés via {source_text}")
+
+# Recherche contrefactuelle
+
+def counterfactual_candidates(client_data):
+   """Candidats des variables actionnables, triés par coût de changement croissant"""
+   axes, ranges, current = [], [], []
+   for feature in COUNTERFACTUAL_FEATURES:
+       min_value, max_value, step = FEATURE_BOUNDS[feature]
+       value = float(np.clip(client_data.get(feature, min_value), min_value, max_value))
+       # Grille grossière (arrondie au pas des curseurs), valeur actuelle incluse ;
+       # le premier candidat accepté est ensuite affiné au pas réel (refine_counterfactual)
+       grid = np.round(np.linspace(min_value, max_value, COUNTERFACTUAL_STEPS + 1) / step) * step
+       axes.append(np.unique(np.append(grid, value)))
+       ranges.append(max_value - min_value)
+       current.append(value)
+
+   mesh = np.meshgrid(*axes, indexing='ij')
+   candidates = np.column_stack([axis.ravel() for axis in mesh])
+   # Coût : variation cumulée, normalisée par l'amplitude de chaque curseur
+   costs = (np.abs(candidates - np.array(current)) / np.array(ranges)).sum(axis=1)
+   order = np.argsort(costs, kind='stable')
+   keep = costs[order] > 0  # le profil actuel est déjà refusé
+   return candidates[order][keep], costs[order][keep], current
+
+def predict_before_deadline(client_data, deadline):
+   """Appel /predict_dashboard dont le timeout est le temps restant avant l'échéance"""
+   remaining = deadline - time.perf_counter()
+   if remaining <= 0:
+       return None, "Budget de temps épuisé"
+   return safe_api_call(f"{API_URL}/predict_dashboard", data=client_data, timeout=remaining)
+
+def score_candidates_api(clients, deadline, executor):
+   """Probabilités via l'API avant l'échéance (hors cache LRU partagé) : appels en attente annulés, NaN pour les non-scorés"""
+   futures = [executor.submit(predict_before_deadline, client, deadline) for client in clients]
+   done, not_done = wait(futures, timeout=max(deadline - time.perf_counter(), 0))
+   for future in not_done:
+       future.cancel()
+
+   probabilities = np.full(len(clients), np.nan)
+   thresholds = []
+   for i, future in enumerate(futures):
+       if future not in done:
+           continue
+       result, _ = future.result()
+       if result:
+           probabilities[i] = result['prediction'].get('probability', np.nan)
+           thresholds.append(result['prediction'].get('threshold'))
+   return probabilities, (thresholds[0] if thresholds else None)
+
+def snap_to_steps(values):
+   """Valeurs des variables actionnables arrondies au pas des curseurs, dans leurs bornes"""
+   snapped = []
+   for feature, value in zip(COUNTERFACTUAL_FEATURES, values):
+       min_value, max_value, step = FEATURE_BOUNDS[feature]
+       snapped.append(float(np.clip(np.round(value / step) * step, min_value, max_value)))
+   return np.array(snapped)
+
+def counterfactual_cost(values, current):
+   """Coût d'un changement : variation cumulée, normalisée par l'amplitude de chaque curseur"""
+   ranges = np.array([FEATURE_BOUNDS[feature][1] - FEATURE_BOUNDS[feature][0] for feature in COUNTERFACTUAL_FEATURES])
+   return float((np.abs(np.asarray(values) - np.asarray(current)) / ranges).sum())
+
+def refine_counterfactual(current, candidate, probability, score, deadline):
+   """Affiner un candidat accepté au pas des curseurs, entre le profil actuel (refusé) et le candidat"""
+   current, candidate = np.asarray(current, dtype=float), np.asarray(candidate, dtype=float)
+   steps = np.array([FEATURE_BOUNDS[feature][2] for feature in COUNTERFACTUAL_FEATURES])
+   total = int(np.ceil(np.max(np.abs(candidate - current) / steps)))
+   # Recherche par tours : k pas de curseur sur le segment, lo refusé, hi accepté
+   lo, hi = 0, total
+   best, best_probability, evaluated = candidate, probability, 0
+   while hi - lo > 1 and time.perf_counter() < deadline:
+       ks = np.unique(np.linspace(lo, hi, COUNTERFACTUAL_REFINE_POINTS + 2).round().astype(int))
+       ks = ks[(ks > lo) & (ks < hi)]
+       points = [snap_to_steps(current + k / total * (candidate - current)) for k in ks]
+       probabilities, threshold = score(points)
+       evaluated += int(np.count_nonzero(~np.isnan(probabilities)))
+       if threshold is None:
+           break
+
+       accepted = np.flatnonzero(probabilities < threshold)
+       refused = np.flatnonzero(probabilities >= threshold)  # NaN : ni accepté ni refusé
+       bounds = (lo, hi)
+       if accepted.size:
+           first = accepted[0]
+           hi, best, best_probability = int(ks[first]), points[first], float(probabilities[first])
+           refused = refused[refused < first]
+       if refused.size:
+           lo = int(ks[refused[-1]])
+       if (lo, hi) == bounds:
+           break  # tour sans réponse exploitable (échéance ou erreurs API)
+   return best, best_probability, evaluated
+
+def search_counterfactual(client_data, time_budget=COUNTERFACTUAL_TIME_BUDGET):
+   """Plus petit changement des variables actionnables faisant passer sous le seuil (budget de temps strict)"""
+   start = time.perf_counter()
+   deadline = start + time_budget
+   candidates, costs, current = counterfactual_candidates(client_data)
+   engine = batch_scoring_engine()
+   chunk_size = COUNTERFACTUAL_CHUNK_LOCAL if engine is not None else COUNTERFACTUAL_CHUNK_API
+   # Appels API dédiés à la recherche, annulables à l'échéance
+   executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix="counterfactual")
+
+   def score(rows):
+       nonlocal engine
+       clients = [
+           {**client_data, **{feature: float(value) for feature, value in zip(COUNTERFACTUAL_FEATURES, row)}}
+           for row in rows
+       ]
+       if engine is not None:
+           try:
+               return engine.predict_batch(clients), engine.threshold
+           except ValueError:
+               # Profil incomplet pour le moteur local : API jusqu'à la fin de la recherche
+               engine = None
+       return score_candidates_api(clients, deadline, executor)
+
+   evaluated = 0
+   try:
+       for chunk_start in range(0, len(candidates), chunk_size):
+           if time.perf_counter() > deadline:
+               return {'status': 'timeout', 'evaluated': evaluated, 'elapsed': time.perf_counter() - start}
+
+           chunk = candidates[chunk_start:chunk_start + chunk_size]
+           probabilities, threshold = score(chunk)
+           evaluated += int(np.count_nonzero(~np.isnan(probabilities)))
+           if threshold is None:
+               continue
+
+           # Arrêt anticipé : candidats triés par coût, le premier accepté est le moins coûteux
+           accepted = np.flatnonzero(probabilities < threshold)
+           if accepted.size:
+               best = accepted[0]
+               # La grille grossière saute des pas entiers : affinage au pas des curseurs
+               values, probability, refined = refine_counterfactual(
+                   current, chunk[best], float(probabilities[best]), score, deadline
+               )
+               evaluated += refined
+               return {
+                   'status': 'found',
+                   'changes': {
+                       feature: (old, float(new))
+                       for feature, old, new in zip(COUNTERFACTUAL_FEATURES, current, values)
+                       if not np.isclose(old, new)
+                   },
+                   'probability': probability,
+                   'threshold': threshold,
+                   'cost': counterfactual_cost(values, current),
+                   'evaluated': evaluated,
+                   'elapsed': time.perf_counter() - start
+               }
+   finally:
+       # Appels pas encore démarrés abandonnés ; ceux en cours s'arrêtent à l'échéance
+       executor.shutdown(wait=False, cancel_futures=True)
+
+   return {'status': 'not_found', 'evaluated': evaluated, 'elapsed': time.perf_counter() - start}
+
+@timed_stage('render:display_counterfactual')
+def display_counterfactual(client_data):
+   """Scénario d'acceptation minimal pour un client refusé"""
+   st.markdown("### 🔎 Que faudrait-il changer pour accepter ce dossier ?")
+   st.caption(
+       f"Variables ajustables : {', '.join(FEATURE_TRANSLATIONS[f] for f in COUNTERFACTUAL_FEATURES)}. "
+       "Genre, éducation et scores externes restent fixes."
+   )
+
+   key = canonical_client_key(client_data)
+   if st.button("🔎 Rechercher un scénario d'acceptation", key="counterfactual_btn"):
+       with st.spinner("🔄 Recherche du plus petit changement..."):
+           st.session_state.counterfactual_result = (key, search_counterfactual(client_data))
+
+   stored = st.session_state.get('counterfactual_result')
+   if stored is None or stored[0] != key:
+       return
+   search = stored[1]
+   stats_text = f"{search['evaluated']:,} scénarios évalués en {search['elapsed']:.2f} s"
+
+   if search['status'] == 'found':
+       rows = []
+       for feature, (old, new) in search['changes'].items():
+           rows.append({
+               'Variable': FEATURE_TRANSLATIONS.get(feature, feature),
+               'Valeur actuelle': f"{old:,.2f}",
+               'Valeur proposée': f"{new:,.2f}",
+               'Variation': f"{new - old:+,.2f}"
+           })
+       st.success(f"✅ Crédit accordé avec une probabilité de défaut de {search['probability']:.1%} "
+                  f"(seuil {search['threshold']:.1%})")
+       st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+       st.caption(stats_text)
+   elif search['status'] == 'timeout':
+       st.warning(f"⏱️ Aucun scénario trouvé dans le temps imparti ({COUNTERFACTUAL_TIME_BUDGET:.0f} s) - {stats_text}")
+   else:
+       st.error(f"❌ Aucun changement des variables ajustables ne permet l'accord - {stats_text}")
+
+@timed_stage('render:display_batch_scoring')
+def display_batch_scoring():
+   """Scoring d'un portefeuille de demandeurs depuis un fichier CSV/Parquet"""
+   with st.expander("ℹ️ Format du fichier", expanded=False):
+       st.markdown(f"""
+       Une ligne par demandeur avec les colonnes : {', '.join(DASHBOARD_FEATURES)}.
+       - **DAYS_EMPLOYED** en jours négatifs, ou colonne **EMPLOYMENT_YEARS** en années
+       - **CODE_GENDER** : M/F (ou Homme/Femme)
+       - **NAME_EDUCATION_TYPE_Higher_education** : 0/1 (ou Non/Oui)
+       """)
+
+   uploaded_file = st.file_uploader("Fichier des demandeurs", type=['csv', 'parquet'], key="batch_file")
+   # Nouveau fichier (ou fichier retiré) : les résultats précédents ne le concernent pas
+   file_id = None if uploaded_file is None else (uploaded_file.name, uploaded_file.size)
+   if st.session_state.get('batch_file_id') != file_id:
+       st.session_state.batch_file_id = file_id
+       st.session_state.batch_results = None
+   if uploaded_file is None:
+       return
+
+   try:
+       if uploaded_file.name.endswith('.parquet'):
+           applicants_df = pd.read_parquet(uploaded_file)
+       else:
+           applicants_df = pd.read_csv(uploaded_file)
+   except Exception as e:
+       st.error(f"Lecture du fichier impossible : {str(e)}")
+       return
+
+   clients, row_errors = prepare_batch_clients(applicants_df)
+   if clients is None:
+       st.error(row_errors)
+       return
+   if not clients:
+       st.warning("⚠️ Le fichier ne contient aucun demandeur")
+       return
+
+   st.info(f"📋 {len(clients)} demandeurs lus, {len(row_errors)} lignes invalides")
+
+   if st.button("🎯 SCORER LE PORTEFEUILLE", type="primary", use_container_width=True, key="batch_score_btn"):
+       progress_bar = st.progress(0.0, text="Scoring en cours...")
+       throughput_placeholder = st.empty()
+       table_placeholder = st.empty()
+
+       rows = []
+       start_time = time.perf_counter()
+       for start, results in score_clients_in_chunks(clients):
+           for offset, (result, error) in enumerate(results):
+               position = start + offset
+               prediction = result.get('prediction', {}) if result else {}
+               rows.append({
+                   'Ligne': position + 1,
+                   'Probabilité': prediction.get('probability'),
+                   'Décision': prediction.get('decision'),
+                   'Niveau de risque': prediction.get('risk_level'),
+                   'Moteur': result.get('source') if result else None,
+                   'Principaux facteurs': None,
+                   'Erreur': row_errors.get(position, error)
+               })
+
+           # Explications exactes du paquet en un seul calcul (lignes explicables localement)
+           explained = [
+               offset for offset, (result, _) in enumerate(results)
+               if result is not None and can_explain_locally(result)
+           ]
+           contributions = explain_clients([clients[start + offset] for offset in explained])
+           for offset, explanation in zip(explained, contributions):
+               if explanation is not None:
+                   rows[start + offset]['Principaux facteurs'] = top_factors_text(explanation)
+
+           # Progression et débit mis à jour à chaque paquet
+           elapsed = time.perf_counter() - start_time
+           progress_bar.progress(len(rows) / len(clients), text=f"{len(rows)}/{len(clients)} demandeurs scorés")
+           throughput_placeholder.caption(f"⚡ Débit : {len(rows) / elapsed:.1f} demandeurs/s ({elapsed:.1f} s)")
+           table_placeholder.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+       st.session_state.batch_results = pd.concat(
+           [applicants_df.reset_index(drop=True), pd.DataFrame(rows).drop(columns='Ligne')], axis=1
+       )
+       progress_bar.progress(1.0, text="✅ Scoring terminé")
+
+   # Résultats conservés en session pour le téléchargement
+   if st.session_state.get('batch_results') is not None:
+       batch_results = st.session_state.batch_results
+       refused = (batch_results['Décision'] == "REFUSE").sum()
+       st.success(f"✅ {len(batch_results)} demandeurs scorés - {refused} refus")
+       st.download_button(
+           "📥 Télécharger les résultats (CSV)",
+           data=batch_results.to_csv(index=False).encode('utf-8'),
+           file_name="scoring_portefeuille.csv",
+           mime="text/csv",
+           use_container_width=True,
+           key="batch_download_btn"
+       )
+
+# Onglets d'analyse du client
+
+def render_results_tab():
+   """Onglet résultats : décision, jauge et explications"""
+   # Titre H3
+   st.markdown("### 📊 Résultats de l'Analyse")
+
+   # Bouton pour modifier
+   col1, col2 = st.columns([3, 1])
+   with col2:
+       if st.button("🔧 Modifier", use_container_width=True):
+           # Reset pour retour au formulaire
+           st.session_state.client_analyzed = False
+           st.session_state.api_call_in_progress = False
+           st.rerun()
+
+   # Profil client
+   display_client_profile(st.session_state.client_data)
+
+   st.markdown("---")
+
+   # Titre H4
+   st.markdown("#### 🎯 Décision de crédit")
+   # Résultat scoring
+   display_prediction_result(st.session_state.prediction_result)
+
+   st.markdown("---")
+
+   # Feature importance avec graphique et tableau détaillé
+   display_feature_importance(st.session_state.prediction_result)
+
+   # Importance globale (calculée hors ligne, mappée en mémoire)
+   with st.expander("🌍 Importance globale des variables (population)", expanded=False):
+       display_global_importance()
+
+   # Scénario d'acceptation pour les dossiers refusés
+   if st.session_state.prediction_result.get('prediction', {}).get('decision') == "REFUSE":
+       st.markdown("---")
+       display_counterfactual(st.session_state.client_data)
+
+def render_comparison_tab():
+   """Onglet comparaisons avec la population"""
+   # Titre H3
+   st.markdown("### 📊 Comparaisons avec la population")
+
+   # Interface comparaison population
+   display_simple_population_comparison(st.session_state.client_data)
+
+def render_bivariate_tab():
+   """Onglet analyses bi-variées"""
+   # Titre H3
+   st.markdown("### 🔧 Analyses bi-variées")
+
+   display_bivariate_panel(st.session_state.client_data)
+
+@st.fragment
+@timed_rerun('bivariee')
+def display_bivariate_panel(client_data):
+   """Choix des variables et analyse bi-variée (fragment : seul ce panneau est ré-exécuté)"""
+   col1, col2 = st.columns(2)
+
+   with col1:
+       var1 = st.selectbox(
+           "Variable 1",
+           DASHBOARD_FEATURES,
+           format_func=lambda x: FEATURE_TRANSLATIONS.get(x, x),
+           key="bivariate_var1"
+       )
+
+   with col2:
+       var2 = st.selectbox(
+           "Variable 2",
+           DASHBOARD_FEATURES,
+           index=1,
+           format_func=lambda x: FEATURE_TRANSLATIONS.get(x, x),
+           key="bivariate_var2"
+       )
+
+   # Cache key symétrique : (A, B) et (B, A) partagent la même entrée
+   cache_key = CacheManager.get_cache_key('bivariate', *sorted((var1, var2)))
+
+   # Vérifier si analyse déjà en cache (la session ne garde que la référence à la version du store)
+   show_analyze_button = False
+   if cache_key in st.session_state:
+       cached_data = st.session_state[cache_key]
+       store, _ = get_population_store()
+       if store is not None and cached_data['pair'] == tuple(sorted((var1, var2))) \
+               and cached_data['version'] == store.version:
+           # Afficher bouton refresh
+           col1, col2 = st.columns([3, 1])
+           with col1:
+               st.success("✅ Analyse déjà effectuée")
+           with col2:
+               if st.button("🔄 Actualiser", help="Recharger l'analyse", key="refresh_bivariate"):
+                   del st.session_state[cache_key]
+                   st.rerun(scope="fragment")
+
+           # Afficher les résultats depuis le store partagé
+           x_data, y_data = store.pair(var1, var2)
+           display_bivariate_analysis({'x_data': x_data, 'y_data': y_data}, var1, var2, client_data)
+       else:
+           # Cache obsolète, le supprimer
+           del st.session_state[cache_key]
+           show_analyze_button = True
+   else:
+       show_analyze_button = True
+
+   # Bouton pour nouvelle analyse (seulement si pas en cache)
+   if show_analyze_button:
+       if st.button("📈 Analyser la relation", use_container_width=True, key="analyze_bivariate_btn"):
+
+           with st.spinner("🔄 Analyse bi-variée en cours..."):
+               # Store population partagé (un seul chargement pour toutes les paires)
+               store, errors = get_population_store()
+
+           if store is not None and var1 in store and var2 in store:
+               x_data, y_data = store.pair(var1, var2)
+
+               if len(x_data) > 0:
+                   # Stocker en cache la référence (pas de copie des valeurs)
+                   st.session_state[cache_key] = {
+                       'pair': tuple(sorted((var1, var2))),
+                       'version': store.version
+                   }
+                   st.session_state.population_loaded = True
+
+                   # Afficher les résultats
+                   display_bivariate_analysis({'x_data': x_data, 'y_data': y_data}, var1, var2, client_data)
+               else:
+                   st.error("Données insuffisantes pour une des variables")
+           else:
+               st.error("Impossible de charger les données pour l'analyse bi-variée")
+
+   # Vue d'ensemble de toutes les paires (matrice calculée une fois par version de population)
+   if st.session_state.population_loaded:
+       with st.expander("🗺️ Vue d'ensemble des corrélations", expanded=False):
+           display_correlation_overview()
+
+def render_simulation_tab():
+   """Onglet simulations what-if et sensibilité"""
+   # Titre H3
+   st.markdown("### 🧪 Simulations")
+
+   # Panneau what-if ré-exécuté seul à chaque mouvement de curseur
+   display_simulation_panel(st.session_state.client_data, st.session_state.prediction_result)
+
+   st.markdown("---")
+   st.markdown("#### 📈 Analyse de sensibilité")
+   display_sensitivity_analysis(st.session_state.client_data)
+
+ANALYSIS_TABS = {
+   "🎯 Résultats": render_results_tab,
+   "📊 Comparaisons": render_comparison_tab,
+   "🔧 Analyses bi-variées": render_bivariate_tab,
+   "🧪 Simulations": render_simulation_tab
+}
+
+# Widgets (préfixes de clés) de chaque onglet dont la valeur doit survivre à un changement d'onglet
+ANALYSIS_TAB_WIDGETS = {
+   "📊 Comparaisons": ('population_variable_select',),
+   "🔧 Analyses bi-variées": ('bivariate_var', 'correlation_method'),
+   "🧪 Simulations": ('sim_', 'sensitivity_feature')
+}
+
+def keep_hidden_tab_widgets(selected_tab):
+   """Conserver l'état des widgets des onglets non construits (sinon effacé par Streamlit)"""
+   hidden_prefixes = tuple(
+       prefix for tab, prefixes in ANALYSIS_TAB_WIDGETS.items() if tab != selected_tab
+       for prefix in prefixes
+   )
+   for key in list(st.session_state.keys()):
+       if key.startswith(hidden_prefixes):
+           st.session_state[key] = st.session_state[key]
+
+# Préchauffage des caches partagés
+
+def warm_local_engine():
+   """Charger moteur et explicateur locaux ; message d'erreur ou None"""
+   engine, error = load_local_engine()
+   if engine is not None:
+       load_local_explainer()
+   return error
+
+def warm_population_stage():
+   """Charger le store population ; message d'erreur ou None"""
+   store, errors = get_population_store()
+   if store is None:
+       return f"population indisponible ({len(errors)} variable(s) en échec)"
+   return None
+
+def missing_message(loader, message):
+   """Étape dont le chargeur retourne None quand la donnée est indisponible"""
+   return lambda: message if loader() is None else None
+
+def run_warm_up(report):
+   """Étapes de préchauffage exécutées dans l'ordre, durée et statut réel de chacune journalisés"""
+   # Chaque étape retourne un message d'erreur, ou None si la donnée est chargée
+   stages = [
+       ("connexion API", lambda: test_api_connection()[2]),
+       ("moteur local", warm_local_engine),
+       ("population", warm_population_stage),
+       ("histogrammes", lambda: None if all(
+           get_population_histogram(variable) is not None for variable in DASHBOARD_FEATURES
+       ) else "histogrammes incomplets"),
+       ("percentiles", missing_message(get_percentile_index, "population indisponible")),
+       ("corrélations", missing_message(get_correlation_summary, "population indisponible")),
+       ("explications globales", missing_message(build_global_importance_figures, "explications globales absentes"))
+   ]
+   total_start = time.perf_counter()
+   for name, stage in stages:
+       start = time.perf_counter()
+       try:
+           error = stage()
+           status = "ok" if error is None else f"échec : {error}"
+       except Exception as e:
+           # Un échec de préchauffage ne doit jamais bloquer l'application
+           status = f"erreur : {str(e)}"
+       elapsed = time.perf_counter() - start
+       report['stages'].append({'Étape': name, 'Durée (s)': round(elapsed, 3), 'Statut': status})
+       logger.info("Préchauffage %s : %.3f s (%s)", name, elapsed, status)
+   report['total'] = time.perf_counter() - total_start
+   logger.info("Préchauffage terminé en %.3f s", report['total'])
+   report['done'].set()
+
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+   """Lancer le préchauffage une seule fois par processus, en arrière-plan"""
+   report = {'stages': [], 'total': None, 'done': threading.Event()}
+   # Thread de processus : aucun contexte de session lié (la session qui le lance peut se terminer avant lui)
+   thread = threading.Thread(target=run_warm_up, args=(report,), name="dashboard-warm-up", daemon=True)
+   thread.start()
+   return report
+
 # Titre principal H1
 st.markdown("# 🏦 Dashboard Credit Scoring - Prêt à dépenser")
 
+# Préchauffage : le premier conseiller saisit le formulaire pendant le chargement des caches
+warm_up_report = start_warm_up()
+warm_up_report['done'].wait(WARMUP_TIMEOUT)
+
 # Vérification API
 api_ok, api_info, api_error = test_api_connection()
 
+local_engine, local_engine_error = load_local_engine()
+
 if not api_ok:
-   st.error(f"⚠️ **API non accessible**: {api_error}")
-   st.stop()
+   if local_engine is None:
+       st.error(f"⚠️ **API non accessible**: {api_error}")
+       st.stop()
+   # API indisponible : le dashboard continue avec le moteur local
+   st.warning(f"⚠️ **API non accessible** ({api_error}) - scoring assuré par le moteur local")
+   if st.session_state.scoring_mode_before_outage is None:
+       st.session_state.scoring_mode_before_outage = st.session_state.scoring_mode
+   st.session_state.scoring_mode = 'local'
+elif st.session_state.scoring_mode_before_outage is not None:
+   # API de nouveau disponible (statut revalidé) : le choix du conseiller est rétabli
+   st.session_state.scoring_mode = st.session_state.scoring_mode_before_outage
+   st.session_state.scoring_mode_before_outage = None
+
+# Invalidation du cache des prédictions si le modèle change
+# (version inconnue pendant une panne : cache conservé, pas de double vidage panne / retour)
+model_version = get_model_version(api_info)
+if model_version is not None:
+   get_prediction_cache().set_version(model_version)
 
 # Sidebar
 with st.sidebar:
 
    st.markdown("### 📋 Navigation")
 
+   app_mode = st.radio(
+       "Mode",
+       ["👤 Client individuel", "📦 Scoring par lot"],
+       key="app_mode",
+       help="Scoring par lot : fichier CSV/Parquet de demandeurs"
+   )
+
    # Nouveu client avec reset complet
    if st.button("🆕 Nouveau client", use_container_width=True):
        # Reset complet de l'état + cache
@@ -1040,6 +3541,9 @@ with st.sidebar:
        st.session_state.client_data = None
        st.session_state.prediction_result = None
        st.session_state.api_call_in_progress = False
+       st.session_state.population_loaded = False
+       st.session_state.pop('analysis_tab', None)
+       reset_simulation_state()
        st.session_state.population_cache = {}  # Reset cache
        st.session_state.bivariate_cache = {}   # Reset cache
        
@@ -1057,10 +3561,80 @@ with st.sidebar:
        st.success("✅ Connectée")
    else:
        st.error("❌ Déconnectée")
+   display_staleness(get_health_cache(), "Statut périmé")
+
+   # Choix du moteur de scoring (si le modèle local est disponible)
+   if local_engine is not None:
+       st.radio(
+           "Moteur de scoring",
+           list(SCORING_MODES),
+           format_func=lambda mode: SCORING_MODES[mode],
+           key="scoring_mode",
+           help="Comparer les latences locale et distante dans « Instrumentation »"
+       )
+   else:
+       st.caption(f"💻 {local_engine_error}")
+
+   # Version de la population affichée dans les graphiques
+   snapshot_path = find_population_snapshot()
+   if snapshot_path is not None:
+       snapshot_info = load_snapshot_metadata(snapshot_path)
+       st.caption(f"📅 Population : snapshot du {snapshot_info['created_at'].replace('T', ' ')} ({snapshot_info['version']})")
+   else:
+       st.caption("📅 Population : API en direct")
+   display_staleness(get_population_cache(), "Données population périmées")
+
+   # Efficacité du cache des prédictions
+   cache_stats = get_prediction_cache().stats()
+   st.caption(
+       f"🗃️ Cache prédictions : {cache_stats['hits']} hits / {cache_stats['misses']} miss "
+       f"({cache_stats['hit_rate']:.0%}) - {cache_stats['size']}/{PREDICTION_CACHE_SIZE} profils"
+   )
+
+   # Appels identiques simultanés servis par un seul appel amont
+   flight_stats = get_single_flight().stats()
+   st.caption(
+       f"🔗 Appels regroupés : {flight_stats['followers']} partagés / {flight_stats['leaders']} envoyés"
+       f" - {flight_stats['timeouts']} attente(s) expirée(s)"
+   )
+
+   # Instrumentation : réseau, modèle, pandas, figures, sérialisation Plotly et rendu
+   if ADMIN_PANEL:
+       with st.expander("⏱️ Instrumentation", expanded=False):
+           latency_stats = get_latency_stats()
+           latency_summary = latency_stats.summary()
+           if latency_summary:
+               st.dataframe(pd.DataFrame(latency_summary), hide_index=True, use_container_width=True)
+               st.caption(f"Percentiles sur les {INSTRUMENTATION_BUFFER_SIZE} dernières mesures par étape (temps serveur, hors affichage navigateur)")
+               col1, col2 = st.columns(2)
+               with col1:
+                   st.download_button("📥 JSON", data=latency_stats.to_json(), file_name="dashboard_metrics.json",
+                                      mime="application/json", use_container_width=True, key="metrics_json_btn")
+               with col2:
+                   st.download_button("📥 Prometheus", data=latency_stats.to_prometheus(), file_name="dashboard_metrics.prom",
+                                      mime="text/plain", use_container_width=True, key="metrics_prometheus_btn")
+           else:
+               st.caption("Aucun appel enregistré")
+
+           if st.session_state.last_analysis_time is not None:
+               st.caption(f"🕒 Dernière analyse : {datetime.fromtimestamp(st.session_state.last_analysis_time):%H:%M:%S}")
+
+           # Durées du préchauffage de ce processus
+           if warm_up_report['done'].is_set():
+               st.caption(f"🔥 Préchauffage : {warm_up_report['total']:.2f} s")
+               st.dataframe(pd.DataFrame(warm_up_report['stages']), hide_index=True, use_container_width=True)
+           else:
+               st.caption("🔥 Préchauffage en cours...")
 
 # INTERFACE PRINCIPALE - APPEL API UNIQUEMENT SUR BOUTON
 
-if not st.session_state.client_analyzed:
+if app_mode == "📦 Scoring par lot":
+   # TITRE H2
+   st.markdown("## 📦 Scoring par lot")
+
+   display_batch_scoring()
+
+elif not st.session_state.client_analyzed:
    # TITRE H2
    st.markdown("## 📝 Saisie des Données Client")
 
@@ -1080,9 +3654,14 @@ if not st.session_state.client_analyzed:
            # Noter l'appel en cours
            st.session_state.api_call_in_progress = True
            
+           # Population préchargée en arrière-plan : la prédiction n'attend pas ce chargement
+           start_population_warm_up()
+
            # Appel API
            with st.spinner("🔄 Analyse en cours..."):
-               result, error = call_prediction_api(client_data)
+               analysis_start = time.perf_counter()
+               result, error = score_client(client_data)
+               get_latency_stats().record('analyse:client', time.perf_counter() - analysis_start, result is not None)
            
            # Résultat
            if result:
@@ -1091,6 +3670,7 @@ if not st.session_state.client_analyzed:
                st.session_state.prediction_result = result
                st.session_state.client_analyzed = True
                st.session_state.last_analysis_time = time.time()
+               reset_simulation_state()
                st.session_state.api_call_in_progress = False
                
                st.success("✅ Client analysé avec succès !")
@@ -1105,130 +3685,21 @@ else:
    st.markdown("## 🎯 Analyse du dossier du client")
    
    # Résultats et analyses
-   tab1, tab2, tab3 = st.tabs(["🎯 Résultats", "📊 Comparaisons", "🔧 Analyses bi-variées"])
-
-   with tab1:
-       # Titre H3
-       st.markdown("### 📊 Résultats de l'Analyse")
-
-       # Bouton pour modifier
-       col1, col2 = st.columns([3, 1])
-       with col2:
-           if st.button("🔧 Modifier", use_container_width=True):
-               # Reset pour retour au formulaire
-               st.session_state.client_analyzed = False
-               st.session_state.api_call_in_progress = False
-               st.rerun()
-
-       # Profil client
-       display_client_profile(st.session_state.client_data)
-
-       st.markdown("---")
-
-       # Titre H4
-       st.markdown("#### 🎯 Décision de crédit")
-       # Résultat scoring
-       display_prediction_result(st.session_state.prediction_result)
-
-       st.markdown("---")
-
-       # Feature importance avec graphique et tableau détaillé
-       display_feature_importance(st.session_state.prediction_result)
-
-   with tab2:
-       # Titre H3
-       st.markdown("### 📊 Comparaisons avec la population")
-
-       # Interface comparaison population
-       display_simple_population_comparison(st.session_state.client_data)
-
-   with tab3:
-       # Titre H3
-       st.markdown("### 🔧 Analyses bi-variées")
-
-       col1, col2 = st.columns(2)
-
-       with col1:
-           var1 = st.selectbox(
-               "Variable 1",
-               DASHBOARD_FEATURES,
-               format_func=lambda x: FEATURE_TRANSLATIONS.get(x, x),
-               key="bivariate_var1"
-           )
-
-       with col2:
-           var2 = st.selectbox(
-               "Variable 2",
-               DASHBOARD_FEATURES,
-               index=1,
-               format_func=lambda x: FEATURE_TRANSLATIONS.get(x, x),
-               key="bivariate_var2"
-           )
-
-       # Cache key pour cette combinaison
-       cache_key = f'bivariate_{var1}_{var2}'
-       
-       # Vérifier si analyse déjà en cache
-       if cache_key in st.session_state:
-           cached_data = st.session_state[cache_key]
-           if cached_data['var1'] == var1 and cached_data['var2'] == var2:
-               # Afficher bouton refresh
-               col1, col2 = st.columns([3, 1])
-               with col1:
-                   st.success("✅ Analyse déjà effectuée")
-               with col2:
-                   if st.button("🔄 Actualiser", help="Recharger l'analyse", key="refresh_bivariate"):
-                       del st.session_state[cache_key]
-                       st.rerun()
-               
-               # Afficher les résultats depuis le cache
-               display_bivariate_analysis(cached_data, var1, var2, st.session_state.client_data)
-           else:
-               # Cache obsolète, le supprimer
-               del st.session_state[cache_key]
-               show_analyze_button = True
-       else:
-           show_analyze_button = True
-       
-       # Bouton pour nouvelle analyse (seulement si pas en cache)
-       if 'show_analyze_button' in locals() and show_analyze_button:
-           if st.button("📈 Analyser la relation", use_container_width=True, key="analyze_bivariate_btn"):
-               
-               with st.spinner("🔄 Analyse bi-variée en cours..."):
-                   # Appels API
-                   dist1 = get_population_distribution(var1)
-                   dist2 = get_population_distribution(var2)
-
-               if dist1 and dist2:
-                   values1 = dist1.get('values', [])
-                   values2 = dist2.get('values', [])
-
-                   if values1 and values2:
-                       # Conversion spéciale pour variables catégorielles
-                       if var1 == 'NAME_EDUCATION_TYPE_Higher_education':
-                           values1 = [1 if v else 0 for v in values1]
-                       if var2 == 'NAME_EDUCATION_TYPE_Higher_education':
-                           values2 = [1 if v else 0 for v in values2]
-
-                       # Assurer même longueur
-                       min_len = min(len(values1), len(values2))
-                       x_data = values1[:min_len]
-                       y_data = values2[:min_len]
-
-                       # Stocker en cache
-                       st.session_state[cache_key] = {
-                           'x_data': x_data,
-                           'y_data': y_data,
-                           'var1': var1,
-                           'var2': var2
-                       }
-                       
-                       # Afficher les résultats
-                       display_bivariate_analysis(st.session_state[cache_key], var1, var2, st.session_state.client_data)
-                   else:
-                       st.error("Données insuffisantes pour une des variables")
-               else:
-                   st.error("Impossible de charger les données pour l'analyse bi-variée")
+   if LAZY_TABS:
+       # Navigation en onglets : seul l'onglet sélectionné est construit à chaque rerun
+       selected_tab = st.radio(
+           "Vue",
+           list(ANALYSIS_TABS),
+           horizontal=True,
+           key="analysis_tab",
+           label_visibility="collapsed"
+       )
+       keep_hidden_tab_widgets(selected_tab)
+       ANALYSIS_TABS[selected_tab]()
+   else:
+       for tab, render_tab in zip(st.tabs(list(ANALYSIS_TABS)), ANALYSIS_TABS.values()):
+           with tab:
+               render_tab()
 
 # Footer
 st.markdown("---")
@@ -1247,4 +3718,14 @@ with col2:
    st.markdown("• Comparaisons population")
 
 with col3:
-   st.markdown("**♿ Accessibilité WCAG 2.1**")
\ No newline at end of file
+   st.markdown("**♿ Accessibilité WCAG 2.1**")
+
+# Durée du rerun complet (à comparer aux reruns des fragments dans « Instrumentation »)
+get_latency_stats().record('rerun:script', time.perf_counter() - SCRIPT_RUN_START)
+
+# Export des mesures pour les outils de benchmark (écriture atomique)
+if METRICS_EXPORT_PATH:
+   metrics_tmp_path = f"{METRICS_EXPORT_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+   with open(metrics_tmp_path, 'w', encoding='utf-8') as metrics_file:
+       metrics_file.write(get_latency_stats().to_json())
+   os.replace(metrics_tmp_path, METRICS_EXPORT_PATH)
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Définitions partagées de la population : variables, bornes des widgets, encodage et histogrammes
+
+Importé par le dashboard (1_Dashboard.py) et par les outils hors ligne (tools/)
+pour que tous produisent les mêmes colonnes et les mêmes barres. Une valeur
+catégorielle manquante reste NaN : elle n'est jamais lue comme « Femme » ou
+« pas d'éducation supérieure ».
+"""
+
+import numpy as np
+
+DASHBOARD_FEATURES = [
+   'EXT_SOURCE_2', 'EXT_SOURCE_3', 'EXT_SOURCE_1',
+   'DAYS_EMPLOYED', 'CODE_GENDER', 'INSTAL_DPD_MEAN',
+   'PAYMENT_RATE', 'NAME_EDUCATION_TYPE_Higher_education',
+   'AMT_ANNUITY', 'INSTAL_AMT_PAYMENT_SUM'
+]
+CATEGORICAL_FEATURES = ['CODE_GENDER', 'NAME_EDUCATION_TYPE_Higher_education']
+# Bornes des widgets (min, max, pas) : formulaire, simulation et recherches - DAYS_EMPLOYED saisi en années
+FEATURE_BOUNDS = {
+   'EXT_SOURCE_2': (0.0, 1.0, 0.01),
+   'EXT_SOURCE_3': (0.0, 1.0, 0.01),
+   'EXT_SOURCE_1': (0.0, 1.0, 0.01),
+   'DAYS_EMPLOYED': (0.0, 40.0, 0.01),
+   'INSTAL_DPD_MEAN': (0.0, 30.0, 0.1),
+   'PAYMENT_RATE': (0.0, 1.0, 0.01),
+   'AMT_ANNUITY': (5000, 100000, 1000),
+   'INSTAL_AMT_PAYMENT_SUM': (10000, 1000000, 10000)
+}
+HISTOGRAM_BINS = 30  # barres par histogramme des variables continues
+
+def is_missing(value):
+   """Valeur manquante : None, NaN ou chaîne vide"""
+   if value is None:
+       return True
+   if isinstance(value, str):
+       return value.strip() == ''
+   try:
+       return bool(np.isnan(value))
+   except TypeError:
+       return False
+
+def encode_categorical_value(value, variable):
+   """Valeur 0/1 d'une variable catégorielle, NaN si manquante"""
+   if is_missing(value):
+       return np.nan
+   if variable == 'CODE_GENDER' and isinstance(value, str):
+       return float(value.strip().upper() == 'M')
+   if variable == 'NAME_EDUCATION_TYPE_Higher_education':
+       return float(bool(value))
+   return float(value)
+
+def encode_categorical_values(values, variable):
+   """Distribution catégorielle en float64 (0/1, NaN pour les valeurs manquantes)"""
+   if isinstance(values, np.ndarray) and values.dtype.kind in 'biuf':
+       encoded = values.astype(np.float64)
+       if variable == 'NAME_EDUCATION_TYPE_Higher_education':
+           missing = np.isnan(encoded)
+           encoded = (encoded != 0).astype(np.float64)
+           encoded[missing] = np.nan
+       return encoded
+   return np.array([encode_categorical_value(value, variable) for value in values], dtype=np.float64)
+
+def histogram_bars(values, variable, bins=HISTOGRAM_BINS):
+   """Barres d'histogramme : comptages exacts (catégorielles) ou np.histogram"""
+   values = np.asarray(values)
+   if variable in CATEGORICAL_FEATURES:
+       categories, counts = np.unique(values, return_counts=True)
+       centers = categories.astype(float)
+       return {
+           'centers': centers,
+           'counts': counts,
+           'widths': np.full(len(centers), 0.6),
+           'lower': centers,
+           'upper': centers
+       }
+
+   counts, edges = np.histogram(values, bins=bins)
+   return {
+       'centers': (edges[:-1] + edges[1:]) / 2,
+       'counts': counts,
+       'widths': np.diff(edges),
+       'lower': edges[:-1],
+       'upper': edges[1:]
+   }
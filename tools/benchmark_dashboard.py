@@ -0,0 +1,276 @@
+"""
+Benchmark reproductible des chemins de données du dashboard
+
+Pour chaque taille de population (10k, 100k, 1M par défaut), démarre l'API locale
+de substitution (tools/mock_api.py), puis rejoue le parcours d'un conseiller avec
+le harnais AppTest de Streamlit :
+   démarrage -> ANALYSER CE CLIENT -> Comparaisons (chargement, changement de variable)
+   -> Analyses bi-variées (plusieurs paires)
+
+Chaque parcours soumet un profil client aléatoire différent (graine --seed), pour que
+les appels /predict_dashboard et l'analyse ne soient pas des hits du cache LRU.
+
+Mesures enregistrées, étiquetées séparément :
+- froid : premier parcours, caches Streamlit vidés
+- chaud : parcours suivants, caches de population chauds mais profil client nouveau
+- profil répété : parcours rejouant le profil du passage à froid (hits de cache)
+- étapes instrumentées par le dashboard (DASHBOARD_METRICS_FILE) : safe_api_call par
+  endpoint, create_simple_population_plot, display_bivariate_analysis, percentiles,
+  corrélations, sérialisation Plotly, table d'importance des variables
+
+Les résultats sont écrits en JSON ; --baseline compare avec un run précédent.
+
+Usage :
+   python tools/benchmark_dashboard.py --repeats 5
+   python tools/benchmark_dashboard.py --sizes 10000 --baseline benchmarks/bench_20250601-120000.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mock_api import POPULATION_SIZES, start_mock_api
+from population_encoding import FEATURE_BOUNDS
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT_DIR, "1_Dashboard.py")
+DEFAULT_OUTPUT_DIR = os.path.join(ROOT_DIR, "benchmarks")
+RUN_TIMEOUT = 300  # secondes par rerun AppTest (population 1M)
+
+# Paires analysées dans l'onglet bi-varié
+BIVARIATE_PAIRS = [
+   ('EXT_SOURCE_2', 'EXT_SOURCE_3'),
+   ('AMT_ANNUITY', 'PAYMENT_RATE'),
+   ('DAYS_EMPLOYED', 'CODE_GENDER')
+]
+# Libellés des champs du formulaire client (widgets sans clé) et choix des listes
+FORM_LABELS = {
+   'EXT_SOURCE_2': "Score Externe 2",
+   'EXT_SOURCE_3': "Score Externe 3",
+   'EXT_SOURCE_1': "Score Externe 1",
+   'DAYS_EMPLOYED': "Ancienneté emploi (années)",
+   'INSTAL_DPD_MEAN': "Retards moyens (jours)",
+   'PAYMENT_RATE': "Ratio d'endettement",
+   'AMT_ANNUITY': "Annuité mensuelle (€)",
+   'INSTAL_AMT_PAYMENT_SUM': "Historique paiements (€)",
+   'CODE_GENDER': "Genre",
+   'NAME_EDUCATION_TYPE_Higher_education': "Éducation supérieure"
+}
+FORM_CHOICES = {
+   'CODE_GENDER': ["Femme", "Homme"],
+   'NAME_EDUCATION_TYPE_Higher_education': ["Non", "Oui"]
+}
+# Étapes instrumentées suivies en priorité dans le résumé console
+KEY_STAGES = [
+   '/predict_dashboard', '/population_batch', 'render:create_simple_population_plot',
+   'render:display_bivariate_analysis', 'calcul:percentile_index', 'calcul:correlation_summary',
+   'plotly:chart', 'render:display_feature_importance'
+]
+
+def configure_environment(api_url, metrics_path, work_dir):
+   """Variables d'environnement lues par 1_Dashboard.py (chemin API uniquement, sans modèle local)"""
+   # Tous les fichiers écrits par le dashboard restent dans le dossier temporaire du benchmark
+   os.environ.update({
+       'DASHBOARD_API_URL': api_url,
+       'DASHBOARD_METRICS_FILE': metrics_path,
+       'DASHBOARD_WARMUP_TIMEOUT': str(RUN_TIMEOUT),
+       'DASHBOARD_MODEL_PATH': os.path.join(work_dir, "absent.pkl"),
+       'DASHBOARD_SNAPSHOT_DIR': os.path.join(work_dir, "snapshots"),
+       'DASHBOARD_POPULATION_STORE_DIR': os.path.join(work_dir, "population_store"),
+       'DASHBOARD_GLOBAL_EXPLANATIONS_DIR': os.path.join(work_dir, "global_explanations")
+   })
+
+def clear_streamlit_caches():
+   """Repartir à froid : caches st.cache_data / st.cache_resource partagés par le processus"""
+   import streamlit as st
+   st.cache_data.clear()
+   st.cache_resource.clear()
+
+def timed_run(app):
+   """Rerun complet du script, en secondes (échec si le script lève une exception)"""
+   start = time.perf_counter()
+   app.run()
+   elapsed = time.perf_counter() - start
+   if app.exception:
+       raise RuntimeError(f"Exception dans le dashboard : {app.exception[0].message}")
+   return elapsed
+
+def random_form_profile(seed):
+   """Profil client tiré au pas des widgets du formulaire (reproductible pour une graine donnée)"""
+   rng = np.random.default_rng(seed)
+   profile = {}
+   for feature, (min_value, max_value, step) in FEATURE_BOUNDS.items():
+       value = min_value + int(rng.integers(0, round((max_value - min_value) / step) + 1)) * step
+       profile[feature] = value if isinstance(step, int) else round(value, 2)
+   for feature, choices in FORM_CHOICES.items():
+       profile[feature] = choices[int(rng.integers(len(choices)))]
+   return profile
+
+def fill_client_form(app, profile):
+   """Saisir un profil dans le formulaire client (widgets repérés par leur libellé)"""
+   widgets = list(app.slider) + list(app.number_input) + list(app.selectbox)
+   for feature, value in profile.items():
+       widget = next(widget for widget in widgets if widget.label == FORM_LABELS[feature])
+       widget.set_value(value)
+
+def run_session_flow(app, think_time=None, profile_seed=None):
+   """Parcours conseiller complet ; durée de chaque rerun par étape (hors temps de réflexion)
+
+   Avec `profile_seed`, le formulaire est rempli d'un profil aléatoire propre à la session ;
+   sans graine, le profil par défaut est soumis (mêmes entrées de cache à chaque parcours).
+   """
+   def act():
+       # Temps de réflexion du conseiller entre deux actions (tests de charge)
+       if think_time is not None:
+           time.sleep(think_time())
+
+   steps = {'demarrage': timed_run(app)}
+
+   act()
+   if profile_seed is not None:
+       fill_client_form(app, random_form_profile(profile_seed))
+   app.button(key="analyze_client_btn").click()
+   steps['analyse'] = timed_run(app)
+
+   act()
+   app.radio(key="analysis_tab").set_value("📊 Comparaisons")
+   steps['onglet_comparaisons'] = timed_run(app)
+   act()
+   app.button(key="load_population_btn").click()
+   steps['comparaison_chargement'] = timed_run(app)
+   act()
+   app.selectbox(key="population_variable_select").set_value('AMT_ANNUITY')
+   steps['comparaison_variable'] = timed_run(app)
+
+   act()
+   app.radio(key="analysis_tab").set_value("🔧 Analyses bi-variées")
+   steps['onglet_bivarie'] = timed_run(app)
+   for var1, var2 in BIVARIATE_PAIRS:
+       act()
+       app.selectbox(key="bivariate_var1").set_value(var1)
+       app.selectbox(key="bivariate_var2").set_value(var2)
+       timed_run(app)
+       app.button(key="analyze_bivariate_btn").click()
+       steps[f"bivariee_{var1}_{var2}"] = timed_run(app)
+   return steps
+
+def new_session():
+   """Session headless du dashboard"""
+   from streamlit.testing.v1 import AppTest
+   return AppTest.from_file(APP_PATH, default_timeout=RUN_TIMEOUT)
+
+def summarize(samples):
+   """Percentiles (ms) d'une liste de durées en secondes"""
+   values = np.array(samples) * 1000
+   return {
+       'n': int(len(values)),
+       'p50_ms': round(float(np.percentile(values, 50)), 2),
+       'p95_ms': round(float(np.percentile(values, 95)), 2),
+       'max_ms': round(float(values.max()), 2)
+   }
+
+def benchmark_size(rows, repeats, work_dir, seed=0):
+   """Parcours à froid, `repeats` parcours à chaud et un parcours au profil répété pour une taille"""
+   start = time.perf_counter()
+   server, api_url, mock_state = start_mock_api(rows)
+   mock_ready = time.perf_counter() - start
+   metrics_path = os.path.join(work_dir, f"metrics_{rows}.json")
+   configure_environment(api_url, metrics_path, work_dir)
+   clear_streamlit_caches()
+
+   try:
+       cold = run_session_flow(new_session(), profile_seed=(seed, rows, 0))
+       # Un profil par parcours à chaud : /predict_dashboard réellement appelé à chaque fois
+       warm_runs = [run_session_flow(new_session(), profile_seed=(seed, rows, run)) for run in range(1, repeats + 1)]
+       repeated = run_session_flow(new_session(), profile_seed=(seed, rows, 0))
+   finally:
+       server.shutdown()
+
+   with open(metrics_path, encoding='utf-8') as file:
+       stages = json.load(file)['stages']
+
+   return {
+       'rows': rows,
+       'mock_ready_s': round(mock_ready, 2),
+       'api_requests': mock_state.requests,
+       'cold_ms': {step: round(elapsed * 1000, 2) for step, elapsed in cold.items()},
+       'warm': {step: summarize([run[step] for run in warm_runs]) for step in cold},
+       'repeated_profile_ms': {step: round(elapsed * 1000, 2) for step, elapsed in repeated.items()},
+       'stages': stages
+   }
+
+def git_commit():
+   """Commit courant (None hors dépôt git)"""
+   try:
+       return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, text=True).strip()
+   except (OSError, subprocess.CalledProcessError):
+       return None
+
+def print_summary(results, baseline=None):
+   """Résumé console : reruns à froid, à chaud et au profil répété, étapes clés, écart au run de référence"""
+   baseline_sizes = {str(size['rows']): size for size in (baseline or {}).get('sizes', [])}
+   for size in results['sizes']:
+       reference = baseline_sizes.get(str(size['rows']))
+       print(f"\n=== Population {size['rows']:,} ({size['api_requests']} requêtes API) ===")
+       print("  froid : caches vidés | chaud : nouveau profil client | profil répété : hits de cache")
+       for step, stats in size['warm'].items():
+           line = (f"  {step:<45} froid {size['cold_ms'][step]:>9.1f} ms | chaud p50 {stats['p50_ms']:>8.1f} ms"
+                   f" | profil répété {size['repeated_profile_ms'][step]:>8.1f} ms")
+           if reference and step in reference['warm']:
+               line += f" ({stats['p50_ms'] / max(reference['warm'][step]['p50_ms'], 1e-9) - 1:+.0%})"
+           print(line)
+       for stage in KEY_STAGES:
+           if stage in size['stages']:
+               stats = size['stages'][stage]
+               line = f"  [{stage}]".ljust(47) + f" p50 {stats['p50'] * 1000:>8.1f} ms | p95 {stats['p95'] * 1000:>8.1f} ms"
+               if reference and stage in reference['stages']:
+                   line += f" ({stats['p50'] / max(reference['stages'][stage]['p50'], 1e-9) - 1:+.0%})"
+               print(line)
+
+def main():
+   parser = argparse.ArgumentParser(description="Benchmark du dashboard contre l'API locale de substitution")
+   parser.add_argument('--sizes', type=int, nargs='+', default=POPULATION_SIZES, help="Tailles de population")
+   parser.add_argument('--repeats', type=int, default=3, help="Parcours à chaud par taille")
+   parser.add_argument('--seed', type=int, default=0, help="Graine des profils clients aléatoires des parcours")
+   parser.add_argument('--output', help="Fichier JSON de résultats (défaut : benchmarks/bench_<date>.json)")
+   parser.add_argument('--baseline', help="Résultats d'un run précédent à comparer")
+   args = parser.parse_args()
+
+   results = {
+       'created_at': datetime.now().isoformat(timespec='seconds'),
+       'git_commit': git_commit(),
+       'python': platform.python_version(),
+       'platform': platform.platform(),
+       'repeats': args.repeats,
+       'seed': args.seed,
+       'sizes': []
+   }
+   with tempfile.TemporaryDirectory(prefix="dashboard-bench-") as work_dir:
+       for rows in args.sizes:
+           results['sizes'].append(benchmark_size(rows, args.repeats, work_dir, args.seed))
+
+   output = args.output or os.path.join(
+       DEFAULT_OUTPUT_DIR, f"bench_{datetime.now():%Y%m%d-%H%M%S}.json"
+   )
+   os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+   with open(output, 'w', encoding='utf-8') as file:
+       json.dump(results, file, indent=2, ensure_ascii=False)
+
+   baseline = None
+   if args.baseline:
+       with open(args.baseline, encoding='utf-8') as file:
+           baseline = json.load(file)
+   print_summary(results, baseline)
+   print(f"\nRésultats -> {output}")
+
+if __name__ == '__main__':
+   main()
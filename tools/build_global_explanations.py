@@ -0,0 +1,120 @@
+"""
+Job hors ligne : explications SHAP globales sur un échantillon de la population
+
+Produit dans le dossier de sortie :
+- shap_values.npy    : contributions SHAP (échantillon x variables, float32)
+- feature_values.npy : valeurs des variables de l'échantillon (float32)
+- metadata.json      : variables, moyenne des |SHAP|, taille d'échantillon, date
+
+Les fichiers .npy sont mappés en mémoire par le dashboard au démarrage.
+
+Usage :
+   python tools/build_global_explanations.py --model models/credit_scoring_model.pkl \\
+       --population population.parquet --sample-size 2000
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from population_encoding import CATEGORICAL_FEATURES, DASHBOARD_FEATURES, encode_categorical_values
+
+API_URL = "https://dashboard-credit-scoring-production.up.railway.app"
+DEFAULT_OUTPUT_DIR = os.path.join(ROOT_DIR, "global_explanations")
+
+def load_model(path):
+   """Charger le modèle sérialisé (joblib si disponible, sinon pickle)"""
+   try:
+       import joblib
+       return joblib.load(path)
+   except ImportError:
+       with open(path, 'rb') as file:
+           return pickle.load(file)
+
+def encode_population(population):
+   """Encodage identique au dashboard : genre M=1/F=0, éducation 0/1, manquant = NaN (géré par SHAP)"""
+   population = population.copy()
+   for variable in CATEGORICAL_FEATURES:
+       population[variable] = encode_categorical_values(population[variable].to_numpy(), variable)
+   return population[DASHBOARD_FEATURES].astype(float)
+
+def fetch_population(api_url):
+   """Récupérer la population depuis l'API (/population/{variable})"""
+   columns = {}
+   for variable in DASHBOARD_FEATURES:
+       response = requests.get(f"{api_url}/population/{variable}", timeout=60)
+       response.raise_for_status()
+       # Pas de conversion ici : CODE_GENDER arrive en 'M'/'F', encodé par encode_population
+       columns[variable] = pd.Series(response.json().get('values', []))
+   return pd.DataFrame(columns)
+
+def read_population(path):
+   """Lire la population depuis un fichier CSV ou Parquet"""
+   if path.endswith('.parquet'):
+       return pd.read_parquet(path, columns=DASHBOARD_FEATURES)
+   return pd.read_csv(path, usecols=DASHBOARD_FEATURES)
+
+def compute_shap_values(model, matrix):
+   """Contributions SHAP de la classe « défaut » (TreeExplainer, sinon pred_contrib)"""
+   try:
+       import shap
+       values = shap.TreeExplainer(model).shap_values(matrix)
+       if isinstance(values, list):
+           values = values[1]
+       if np.ndim(values) == 3:
+           values = values[:, :, 1]
+       return np.asarray(values)
+   except ImportError:
+       return model.booster_.predict(matrix, pred_contrib=True)[:, :matrix.shape[1]]
+
+def main():
+   parser = argparse.ArgumentParser(description="Calcul hors ligne des explications SHAP globales")
+   parser.add_argument('--model', required=True, help="Modèle sérialisé (joblib/pickle)")
+   parser.add_argument('--population', help="Fichier CSV/Parquet de la population (sinon API)")
+   parser.add_argument('--api-url', default=API_URL, help="API utilisée si --population est absent")
+   parser.add_argument('--sample-size', type=int, default=2000, help="Clients échantillonnés")
+   parser.add_argument('--seed', type=int, default=42)
+   parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR)
+   args = parser.parse_args()
+
+   start = time.perf_counter()
+   model = load_model(args.model)
+   population = read_population(args.population) if args.population else fetch_population(args.api_url)
+   population = encode_population(population)
+
+   # Échantillon représentatif (tirage aléatoire simple, reproductible)
+   sample = population.sample(n=min(args.sample_size, len(population)), random_state=args.seed)
+   features = list(getattr(model, 'feature_names_in_', DASHBOARD_FEATURES))
+   matrix = sample[features].to_numpy(dtype=np.float64)
+
+   shap_values = compute_shap_values(model, matrix).astype(np.float32)
+
+   os.makedirs(args.output_dir, exist_ok=True)
+   np.save(os.path.join(args.output_dir, "shap_values.npy"), shap_values)
+   np.save(os.path.join(args.output_dir, "feature_values.npy"), matrix.astype(np.float32))
+   metadata = {
+       'features': features,
+       'mean_abs_shap': np.abs(shap_values).mean(axis=0).astype(float).tolist(),
+       'sample_size': int(len(sample)),
+       'population_size': int(len(population)),
+       'model': os.path.basename(args.model),
+       'created_at': datetime.now().isoformat(timespec='seconds')
+   }
+   with open(os.path.join(args.output_dir, "metadata.json"), 'w', encoding='utf-8') as file:
+       json.dump(metadata, file, indent=2, ensure_ascii=False)
+
+   print(f"Explications globales : {len(sample)} clients, {len(features)} variables "
+         f"-> {args.output_dir} ({time.perf_counter() - start:.1f} s)")
+
+if __name__ == '__main__':
+   main()
@@ -0,0 +1,138 @@
+"""
+Construction hors ligne d'un snapshot versionné de la population
+
+Produit un fichier Parquet compressé (zstd) contenant :
+- les 10 variables du dashboard (float32, int8 pour le genre et l'éducation)
+- une colonne triée par variable (__sorted__<variable>) pour les percentiles
+- en métadonnées : version, date, source, effectifs et histogrammes pré-calculés
+
+Le dashboard charge le snapshot le plus récent du dossier snapshots/ au démarrage.
+
+Usage :
+   python tools/build_population_snapshot.py                  # depuis l'API
+   python tools/build_population_snapshot.py --input pop.csv  # depuis un fichier
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from population_encoding import CATEGORICAL_FEATURES, DASHBOARD_FEATURES, encode_categorical_values, histogram_bars
+
+API_URL = "https://dashboard-credit-scoring-production.up.railway.app"
+SNAPSHOT_METADATA_KEY = b'population_snapshot'
+SORTED_PREFIX = '__sorted__'
+DEFAULT_OUTPUT_DIR = os.path.join(ROOT_DIR, "snapshots")
+
+def fetch_from_api(api_url):
+   """Distributions de chaque variable depuis /population/{variable}"""
+   distributions = {}
+   for variable in DASHBOARD_FEATURES:
+       response = requests.get(f"{api_url}/population/{variable}", timeout=60)
+       response.raise_for_status()
+       distributions[variable] = response.json().get('values', [])
+   return distributions
+
+def read_from_file(path):
+   """Distributions de chaque variable depuis un fichier CSV ou Parquet"""
+   if path.endswith('.parquet'):
+       population = pd.read_parquet(path, columns=DASHBOARD_FEATURES)
+   else:
+       population = pd.read_csv(path, usecols=DASHBOARD_FEATURES)
+   return {variable: population[variable].tolist() for variable in DASHBOARD_FEATURES}
+
+def encode_column(values, variable):
+   """float32 pour les continues, int8 (manquant = masque) pour les catégorielles"""
+   if variable in CATEGORICAL_FEATURES:
+       values = encode_categorical_values(values, variable)
+   else:
+       values = pd.Series(values).astype(float).to_numpy()
+   mask = np.isnan(values)
+   if variable in CATEGORICAL_FEATURES:
+       return np.where(mask, 0, values).astype(np.int8), mask
+   return values.astype(np.float32), mask
+
+def compute_histogram(values, variable):
+   """Barres du dashboard (population_encoding.histogram_bars), sérialisables en JSON"""
+   return {key: bars.tolist() for key, bars in histogram_bars(values, variable).items()}
+
+def pad(array, mask, length):
+   """Colonne Arrow de longueur fixe, complétée par des valeurs nulles"""
+   full_mask = np.ones(length, dtype=bool)
+   full_mask[:len(array)] = mask
+   padded = np.zeros(length, dtype=array.dtype)
+   padded[:len(array)] = array
+   return pa.array(padded, mask=full_mask)
+
+def build_snapshot(distributions, source):
+   """Table Arrow du snapshot et ses métadonnées"""
+   encoded = {variable: encode_column(values, variable) for variable, values in distributions.items()}
+   length = max(len(values) for values, _ in encoded.values())
+
+   digest = hashlib.sha1()
+   arrays, names, histograms, counts = [], [], {}, {}
+   for variable in DASHBOARD_FEATURES:
+       values, mask = encoded[variable]
+       valid = values[~mask]
+       digest.update(variable.encode())
+       digest.update(values.tobytes())
+       digest.update(mask.tobytes())
+
+       arrays.append(pad(values, mask, length))
+       names.append(variable)
+       # Index trié pré-calculé (percentiles en O(log n) sans tri au démarrage)
+       arrays.append(pad(np.sort(valid), np.zeros(len(valid), dtype=bool), length))
+       names.append(f"{SORTED_PREFIX}{variable}")
+       histograms[variable] = compute_histogram(valid, variable)
+       counts[variable] = int(len(values))
+
+   created_at = datetime.now()
+   metadata = {
+       'version': digest.hexdigest()[:12],
+       'created_at': created_at.isoformat(timespec='seconds'),
+       'source': source,
+       'features': DASHBOARD_FEATURES,
+       'row_counts': counts,
+       'histograms': histograms
+   }
+   table = pa.Table.from_arrays(arrays, names=names)
+   table = table.replace_schema_metadata({SNAPSHOT_METADATA_KEY: json.dumps(metadata).encode('utf-8')})
+   return table, metadata
+
+def main():
+   parser = argparse.ArgumentParser(description="Snapshot Parquet versionné de la population")
+   parser.add_argument('--input', help="Fichier CSV/Parquet de la population (sinon API)")
+   parser.add_argument('--api-url', default=API_URL)
+   parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR)
+   args = parser.parse_args()
+
+   start = time.perf_counter()
+   if args.input:
+       distributions, source = read_from_file(args.input), os.path.basename(args.input)
+   else:
+       distributions, source = fetch_from_api(args.api_url), args.api_url
+
+   table, metadata = build_snapshot(distributions, source)
+
+   os.makedirs(args.output_dir, exist_ok=True)
+   timestamp = datetime.fromisoformat(metadata['created_at']).strftime('%Y%m%d-%H%M%S')
+   path = os.path.join(args.output_dir, f"population_{timestamp}_{metadata['version']}.parquet")
+   pq.write_table(table, path, compression='zstd')
+
+   print(f"Snapshot {metadata['version']} : {table.num_rows:,} lignes, "
+         f"{os.path.getsize(path) / 1e6:.1f} Mo -> {path} ({time.perf_counter() - start:.1f} s)")
+
+if __name__ == '__main__':
+   main()
@@ -0,0 +1,212 @@
+"""
+Test de charge : N sessions conseiller simultanées sur un même processus dashboard
+
+Chaque session headless (AppTest) rejoue le parcours réel de bout en bout :
+   formulaire -> ANALYSER CE CLIENT -> Comparaisons -> Analyses bi-variées
+Le formulaire reçoit un profil aléatoire propre à chaque session (graine dérivée de
+--seed, du niveau et du numéro de session) : sans cela toutes les sessions
+soumettraient le même client et la mesure ne porterait que sur des hits de cache.
+Toutes les sessions partagent le processus, donc les caches st.cache_data /
+st.cache_resource et le GIL, comme dans un conteneur Streamlit. L'API locale de
+substitution tourne dans un processus séparé pour ne pas fausser la mesure CPU.
+
+Pour chaque niveau de concurrence, le rapport donne :
+- les percentiles de durée des reruns (toutes étapes, et par étape)
+- le débit (reruns/s) et le nombre de parcours en échec
+- la mémoire du processus entier, toutes sessions confondues (RSS courant avec
+  psutil, sinon pic ru_maxrss : la croissance n'est alors qu'une borne basse) ;
+  la mémoire par session n'en est qu'une approximation (croissance / sessions)
+- la saturation CPU (cœurs utilisés par le processus ; ~1.0 = GIL saturé)
+
+Un parcours en échec invalide le niveau : ses mesures sont marquées en échec dans
+le rapport, les erreurs affichées, et le script se termine avec le code 1.
+
+Usage :
+   python tools/load_test_dashboard.py --sessions 1 5 10 20 --rows 100000
+   python tools/load_test_dashboard.py --sessions 10 --think-time 2 --api-url http://127.0.0.1:8765
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import requests
+
+from benchmark_dashboard import configure_environment, new_session, run_session_flow
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(TOOLS_DIR), "benchmarks")
+MOCK_STARTUP_TIMEOUT = 300  # secondes (population 1M)
+
+def start_mock_process(rows, port):
+   """API locale dans un processus séparé ; attend que /health réponde"""
+   process = subprocess.Popen(
+       [sys.executable, os.path.join(TOOLS_DIR, "mock_api.py"), "--rows", str(rows), "--port", str(port)],
+       stdout=subprocess.DEVNULL
+   )
+   api_url = f"http://127.0.0.1:{port}"
+   deadline = time.monotonic() + MOCK_STARTUP_TIMEOUT
+   while time.monotonic() < deadline:
+       try:
+           if requests.get(f"{api_url}/health", timeout=1).ok:
+               return process, api_url
+       except requests.exceptions.RequestException:
+           time.sleep(0.5)
+   process.terminate()
+   raise RuntimeError(f"API locale non disponible après {MOCK_STARTUP_TIMEOUT} s")
+
+def process_memory():
+   """Mémoire du processus entier en Mo et sa nature : RSS courant (psutil) ou pic ru_maxrss"""
+   try:
+       import psutil
+       return psutil.Process().memory_info().rss / 1e6, 'rss'
+   except ImportError:
+       import resource
+       return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3, 'pic_ru_maxrss'
+
+def cpu_seconds():
+   """Temps CPU consommé par le processus (utilisateur + système)"""
+   times = os.times()
+   return times.user + times.system
+
+def run_sessions(count, think_time, ramp_up, seed=0):
+   """Lancer `count` sessions en parallèle, chacune avec son profil client ; durées des reruns et erreurs"""
+   results, errors = [], []
+   lock = threading.Lock()
+
+   def session_worker(index):
+       # Arrivées étalées sur la durée de montée en charge
+       time.sleep(ramp_up * index / max(count, 1))
+       try:
+           app = new_session()
+           pause = (lambda: random.expovariate(1 / think_time)) if think_time else None
+           steps = run_session_flow(app, think_time=pause, profile_seed=(seed, count, index))
+           with lock:
+               results.append(steps)
+       except Exception as e:
+           with lock:
+               errors.append(f"session {index} : {type(e).__name__}: {e}")
+
+   threads = [threading.Thread(target=session_worker, args=(i,), name=f"session-{i}") for i in range(count)]
+   for thread in threads:
+       thread.start()
+   for thread in threads:
+       thread.join()
+   return results, errors
+
+def percentiles(values):
+   """p50/p95/p99/max en ms"""
+   values = np.array(values) * 1000
+   if len(values) == 0:
+       return None
+   p50, p95, p99 = np.percentile(values, [50, 95, 99])
+   return {'p50_ms': round(p50, 1), 'p95_ms': round(p95, 1), 'p99_ms': round(p99, 1), 'max_ms': round(values.max(), 1)}
+
+def measure_level(count, think_time, ramp_up, seed=0):
+   """Un niveau de concurrence : latences, débit, mémoire et CPU"""
+   memory_before, memory_metric = process_memory()
+   cpu_before = cpu_seconds()
+   start = time.perf_counter()
+
+   results, errors = run_sessions(count, think_time, ramp_up, seed)
+
+   wall = time.perf_counter() - start
+   cpu_used = cpu_seconds() - cpu_before
+   memory_after, _ = process_memory()
+   memory_growth = memory_after - memory_before
+
+   reruns = [elapsed for steps in results for elapsed in steps.values()]
+   steps = sorted({step for result in results for step in result})
+   return {
+       'sessions': count,
+       'status': 'ok' if not errors else 'échec',
+       'completed': len(results),
+       'errors': errors,
+       'wall_s': round(wall, 2),
+       'reruns_per_s': round(len(reruns) / wall, 2) if wall else None,
+       'rerun_latency': percentiles(reruns),
+       'steps': {step: percentiles([result[step] for result in results if step in result]) for step in steps},
+       # Processus entier (toutes sessions, caches partagés) : pas une mesure par session
+       'process_memory': {
+           'metric': memory_metric,
+           'before_mb': round(memory_before, 1),
+           'after_mb': round(memory_after, 1),
+           'growth_mb': round(memory_growth, 1),
+           # Approximation : croissance du processus entier divisée par le nombre de sessions
+           'approx_growth_per_session_mb': round(memory_growth / count, 2) if count else None
+       },
+       'cpu_cores_used': round(cpu_used / wall, 2) if wall else None,
+       'cpu_saturation': round(cpu_used / wall / (os.cpu_count() or 1), 3) if wall else None
+   }
+
+def main():
+   parser = argparse.ArgumentParser(description="Test de charge du dashboard (sessions AppTest simultanées)")
+   parser.add_argument('--sessions', type=int, nargs='+', default=[1, 5, 10, 20], help="Niveaux de concurrence")
+   parser.add_argument('--rows', type=int, default=100_000, help="Taille de la population de l'API locale")
+   parser.add_argument('--port', type=int, default=8765)
+   parser.add_argument('--api-url', help="API déjà démarrée (sinon tools/mock_api.py est lancé)")
+   parser.add_argument('--think-time', type=float, default=0.0, help="Temps de réflexion moyen entre actions (s)")
+   parser.add_argument('--ramp-up', type=float, default=0.0, help="Durée d'arrivée des sessions (s)")
+   parser.add_argument('--seed', type=int, default=0, help="Graine des profils clients aléatoires des sessions")
+   parser.add_argument('--output', help="Fichier JSON (défaut : benchmarks/load_<date>.json)")
+   args = parser.parse_args()
+
+   mock_process = None
+   api_url = args.api_url
+   if api_url is None:
+       mock_process, api_url = start_mock_process(args.rows, args.port)
+
+   report = {
+       'created_at': datetime.now().isoformat(timespec='seconds'),
+       'rows': args.rows,
+       'cpu_count': os.cpu_count(),
+       'think_time_s': args.think_time,
+       'seed': args.seed,
+       'levels': []
+   }
+   try:
+       with tempfile.TemporaryDirectory(prefix="dashboard-load-") as work_dir:
+           configure_environment(api_url, os.path.join(work_dir, "metrics.json"), work_dir)
+           # Session de chauffe : mesures à caches chauds, comme un conteneur en service
+           run_session_flow(new_session())
+           for count in args.sessions:
+               level = measure_level(count, args.think_time, args.ramp_up, args.seed)
+               report['levels'].append(level)
+               if level['errors']:
+                   # Niveau invalide : ses latences ne sont pas présentées comme des mesures normales
+                   print(f"{count:>4} sessions : ÉCHEC - {len(level['errors'])} parcours sur {count} en erreur", file=sys.stderr)
+                   for error in level['errors']:
+                       print(f"       {error}", file=sys.stderr)
+                   continue
+               latency = level['rerun_latency'] or {}
+               memory = level['process_memory']
+               print(f"{count:>4} sessions : p50 {latency.get('p50_ms', float('nan')):>8.1f} ms | "
+                     f"p95 {latency.get('p95_ms', float('nan')):>8.1f} ms | "
+                     f"{level['reruns_per_s']:>6.1f} reruns/s | "
+                     f"mémoire processus {memory['after_mb']:>7.1f} Mo ({memory['growth_mb']:+.1f}, {memory['metric']}) | "
+                     f"≈{memory['approx_growth_per_session_mb']:+.2f} Mo/session (approx.) | "
+                     f"CPU {level['cpu_cores_used']:.2f} cœur(s)")
+   finally:
+       if mock_process is not None:
+           mock_process.terminate()
+
+   output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f"load_{datetime.now():%Y%m%d-%H%M%S}.json")
+   os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+   with open(output, 'w', encoding='utf-8') as file:
+       json.dump(report, file, indent=2, ensure_ascii=False)
+   print(f"Rapport -> {output}")
+
+   failed = [level['sessions'] for level in report['levels'] if level['errors']]
+   if failed:
+       sys.exit(f"Parcours en échec aux niveaux {failed} : résultats de ces niveaux non exploitables")
+
+if __name__ == '__main__':
+   main()
@@ -0,0 +1,236 @@
+"""
+API locale de substitution pour les benchmarks et tests de charge du dashboard
+
+Sert les routes consommées par 1_Dashboard.py avec une population synthétique
+reproductible (graine fixe) :
+- GET  /health
+- POST /predict_dashboard
+- GET  /population/{variable}
+- POST /population_batch        (désactivable avec --no-batch-route)
+- POST /bivariate_analysis
+
+Les réponses de population sont sérialisées une seule fois au démarrage : le
+serveur mesure le dashboard, pas son propre encodage JSON.
+
+Usage :
+   python tools/mock_api.py --rows 100000 --port 8765
+   DASHBOARD_API_URL=http://127.0.0.1:8765 streamlit run 1_Dashboard.py
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from population_encoding import DASHBOARD_FEATURES
+
+POPULATION_SIZES = [10_000, 100_000, 1_000_000]
+MOCK_THRESHOLD = 0.1
+MOCK_TOP_FEATURES = 5
+
+# Modèle linéaire factice : contribution = poids * (valeur centrée réduite)
+MOCK_WEIGHTS = {
+   'EXT_SOURCE_2': -0.9, 'EXT_SOURCE_3': -0.8, 'EXT_SOURCE_1': -0.5,
+   'DAYS_EMPLOYED': 0.3, 'CODE_GENDER': 0.2, 'INSTAL_DPD_MEAN': 0.4,
+   'PAYMENT_RATE': 0.25, 'NAME_EDUCATION_TYPE_Higher_education': -0.3,
+   'AMT_ANNUITY': 0.1, 'INSTAL_AMT_PAYMENT_SUM': -0.15
+}
+MOCK_INTERCEPT = -2.6
+
+def generate_population(rows, seed=42):
+   """Population synthétique : distributions proches des données réelles, valeurs manquantes incluses"""
+   rng = np.random.default_rng(seed)
+   population = {
+       'EXT_SOURCE_1': rng.beta(2.5, 2.5, rows),
+       'EXT_SOURCE_2': rng.beta(4.0, 2.5, rows),
+       'EXT_SOURCE_3': rng.beta(3.0, 2.5, rows),
+       'DAYS_EMPLOYED': -np.minimum(rng.exponential(2200, rows), 17000).round(),
+       'CODE_GENDER': (rng.random(rows) < 0.35).astype(float),
+       'INSTAL_DPD_MEAN': np.minimum(rng.exponential(0.8, rows), 50).round(2),
+       'PAYMENT_RATE': np.clip(rng.normal(0.054, 0.022, rows), 0.02, 0.15),
+       'NAME_EDUCATION_TYPE_Higher_education': (rng.random(rows) < 0.24).astype(float),
+       'AMT_ANNUITY': np.clip(rng.lognormal(10.1, 0.5, rows), 1600, 260000).round(),
+       'INSTAL_AMT_PAYMENT_SUM': np.clip(rng.lognormal(12.2, 1.1, rows), 0, 1e7).round()
+   }
+   # Taux de valeurs manquantes des scores externes
+   for variable, missing_rate in (('EXT_SOURCE_1', 0.56), ('EXT_SOURCE_3', 0.2), ('EXT_SOURCE_2', 0.002)):
+       population[variable][rng.random(rows) < missing_rate] = np.nan
+   return population
+
+def to_json_values(values):
+   """Liste JSON d'une colonne (NaN -> null, comme l'API réelle)"""
+   return np.where(np.isnan(values), None, values).tolist()
+
+class MockState:
+   """Population, statistiques de normalisation et réponses pré-sérialisées"""
+
+   def __init__(self, rows, seed=42, latency=0.0, batch_route=True):
+       self.rows = rows
+       self.latency = latency
+       self.batch_route = batch_route
+       self.population = generate_population(rows, seed)
+       self.means = {variable: float(np.nanmean(values)) for variable, values in self.population.items()}
+       self.stds = {variable: float(np.nanstd(values)) or 1.0 for variable, values in self.population.items()}
+       self.population_bodies = {
+           variable: json.dumps({'variable': variable, 'count': rows, 'values': to_json_values(values)}).encode()
+           for variable, values in self.population.items()
+       }
+       self.health_body = json.dumps({
+           'status': 'healthy',
+           'model_loaded': True,
+           'model_version': f"mock-{rows}",
+           'population_size': rows
+       }).encode()
+       self.requests = 0
+       self._lock = threading.Lock()
+
+   def count_request(self):
+       with self._lock:
+           self.requests += 1
+
+   def encode_client(self, variable, value):
+       """Valeur numérique d'un champ client (même encodage que la population)"""
+       if variable == 'CODE_GENDER':
+           return 1.0 if value == 'M' else 0.0
+       try:
+           value = float(value)
+       except (TypeError, ValueError):
+           return self.means[variable]
+       return self.means[variable] if math.isnan(value) else value
+
+   def batch_body(self, variables):
+       """Réponse /population_batch assemblée à partir des corps déjà sérialisés"""
+       entries = b', '.join(
+           json.dumps(variable).encode() + b': ' + self.population_bodies[variable]
+           for variable in variables
+       )
+       return b'{"distributions": {' + entries + b'}}'
+
+   def predict(self, client):
+       """Réponse /predict_dashboard : probabilité logistique et contributions linéaires"""
+       contributions = {
+           variable: MOCK_WEIGHTS[variable]
+           * (self.encode_client(variable, client.get(variable)) - self.means[variable]) / self.stds[variable]
+           for variable in DASHBOARD_FEATURES
+       }
+       probability = 1 / (1 + math.exp(-(MOCK_INTERCEPT + sum(contributions.values()))))
+       decision = "REFUSE" if probability >= MOCK_THRESHOLD else "ACCORDE"
+       top = sorted(contributions.items(), key=lambda item: -abs(item[1]))[:MOCK_TOP_FEATURES]
+       return {
+           'prediction': {
+               'probability': probability,
+               'decision': decision,
+               'decision_fr': "Refusé" if decision == "REFUSE" else "Accordé",
+               'risk_level': "Faible" if probability < MOCK_THRESHOLD else "Élevé",
+               'threshold': MOCK_THRESHOLD
+           },
+           'explanation': {'top_features': [{'feature': f, 'shap_value': v} for f, v in top]}
+       }
+
+   def bivariate(self, var1, var2):
+       """Réponse /bivariate_analysis : couples renseignés et corrélation de Pearson"""
+       x_data, y_data = self.population[var1], self.population[var2]
+       valid = ~np.isnan(x_data) & ~np.isnan(y_data)
+       correlation = float(np.corrcoef(x_data[valid], y_data[valid])[0, 1]) if valid.sum() > 1 else None
+       return {
+           'variable1': var1,
+           'variable2': var2,
+           'x_data': x_data[valid].tolist(),
+           'y_data': y_data[valid].tolist(),
+           'correlation': correlation,
+           'sample_size': int(valid.sum())
+       }
+
+def make_handler(state):
+   """Handler HTTP lié à un état de mock"""
+
+   class MockHandler(BaseHTTPRequestHandler):
+       protocol_version = "HTTP/1.1"  # keep-alive, comme l'API de production
+
+       def log_message(self, format, *args):
+           pass
+
+       def send_body(self, body, status=200):
+           if state.latency:
+               time.sleep(state.latency)
+           self.send_response(status)
+           self.send_header("Content-Type", "application/json")
+           self.send_header("Content-Length", str(len(body)))
+           self.end_headers()
+           self.wfile.write(body)
+
+       def send_json(self, payload, status=200):
+           self.send_body(json.dumps(payload).encode(), status)
+
+       def read_json(self):
+           length = int(self.headers.get("Content-Length", 0))
+           return json.loads(self.rfile.read(length) or b'{}')
+
+       def do_GET(self):
+           state.count_request()
+           path = self.path.split('?')[0]
+           if path == '/health':
+               self.send_body(state.health_body)
+           elif path.startswith('/population/'):
+               variable = path[len('/population/'):]
+               if variable in state.population_bodies:
+                   self.send_body(state.population_bodies[variable])
+               else:
+                   self.send_json({'detail': f"Variable inconnue : {variable}"}, 404)
+           else:
+               self.send_json({'detail': "Not Found"}, 404)
+
+       def do_POST(self):
+           state.count_request()
+           path = self.path.split('?')[0]
+           payload = self.read_json()
+           if path == '/predict_dashboard':
+               self.send_json(state.predict(payload))
+           elif path == '/population_batch' and state.batch_route:
+               variables = [v for v in payload.get('variables', []) if v in state.population_bodies]
+               self.send_body(state.batch_body(variables))
+           elif path == '/bivariate_analysis':
+               var1, var2 = payload.get('variable1'), payload.get('variable2')
+               if var1 in state.population and var2 in state.population:
+                   self.send_json(state.bivariate(var1, var2))
+               else:
+                   self.send_json({'detail': "Variables inconnues"}, 404)
+           else:
+               self.send_json({'detail': "Not Found"}, 404)
+
+   return MockHandler
+
+def start_mock_api(rows, port=0, seed=42, latency=0.0, batch_route=True):
+   """Démarrer le mock dans un thread ; retourne (serveur, URL de base, état)"""
+   state = MockState(rows, seed, latency, batch_route)
+   server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+   server.daemon_threads = True
+   threading.Thread(target=server.serve_forever, name="mock-api", daemon=True).start()
+   return server, f"http://127.0.0.1:{server.server_address[1]}", state
+
+def main():
+   parser = argparse.ArgumentParser(description="API locale de substitution (population synthétique)")
+   parser.add_argument('--rows', type=int, default=POPULATION_SIZES[1], help="Taille de la population synthétique")
+   parser.add_argument('--port', type=int, default=8765)
+   parser.add_argument('--seed', type=int, default=42)
+   parser.add_argument('--latency', type=float, default=0.0, help="Délai ajouté à chaque réponse (s)")
+   parser.add_argument('--no-batch-route', action='store_true', help="Désactiver /population_batch")
+   args = parser.parse_args()
+
+   start = time.perf_counter()
+   server, url, _ = start_mock_api(args.rows, args.port, args.seed, args.latency, not args.no_batch_route)
+   print(f"Mock API : {args.rows:,} clients sur {url} (prêt en {time.perf_counter() - start:.1f} s)")
+   try:
+       threading.Event().wait()
+   except KeyboardInterrupt:
+       server.shutdown()
+
+if __name__ == '__main__':
+   main()